@@ -1,11 +1,14 @@
 """FastAPI application."""
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel
 from pathlib import Path
 import shutil
+import orjson
 import os
 from loguru import logger
 
@@ -17,22 +20,43 @@ from retrieval.query_engine import QueryEngine
 from services.document_service import DocumentService
 from services.query_service import QueryService
 
+# Server-Sent Event endpoints; gzip would buffer their events until the stream ends
+SSE_PATHS = {"/api/query/stream"}
+
+
+class _SkipStreamsGZipMiddleware(GZipMiddleware):
+    """GZip middleware that passes Server-Sent Event streams through uncompressed."""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in SSE_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Context-Aware Research Assistant API",
     description="API for PDF document ingestion and graph-based querying",
     version="1.0.0",
+    default_response_class=ORJSONResponse,  # orjson serializes responses several times faster than stdlib json
 )
 
 # CORS middleware
+# A wildcard origin is served without credentials so Starlette can send a static
+# "*" header; list concrete origins to allow credentials.
+allow_all_origins = "*" in settings.cors_origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify allowed origins
-    allow_credentials=True,
+    allow_origins=settings.cors_origins,
+    allow_credentials=not allow_all_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress responses (answers with source chunks) for clients that accept gzip
+app.add_middleware(_SkipStreamsGZipMiddleware, minimum_size=1024)
+
 # Global components (initialized on startup)
 neo4j_store: Neo4jStore = None
 vector_store: VectorStore = None
@@ -41,6 +65,13 @@ query_service: QueryService = None
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
+UPLOAD_BUFFER_SIZE = 1 << 20  # 1 MiB copy buffer (default is 16-64 KB)
+
+
+def _save_upload(file: UploadFile, file_path: Path):
+    """Copy an uploaded file to disk. Blocking; run off the event loop."""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer, UPLOAD_BUFFER_SIZE)
 
 
 # Pydantic models
@@ -62,15 +93,18 @@ async def startup_event():
         # Initialize stores
         neo4j_store = Neo4jStore()
         vector_store = VectorStore()
-        
-        # Initialize services
-        document_service = DocumentService(neo4j_store, vector_store)
+        await run_in_threadpool(vector_store.warmup)
         
         # Initialize retrieval components
         retriever = GraphRAGRetriever(vector_store, neo4j_store)
         query_engine = QueryEngine(retriever)
         query_service = QueryService(retriever, query_engine)
         
+        # Initialize services; cached answers are dropped whenever a document is ingested
+        document_service = DocumentService(
+            neo4j_store, vector_store, on_ingested=query_service.invalidate_cache
+        )
+        
         logger.info("Services initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
@@ -82,7 +116,7 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     global neo4j_store
     if neo4j_store:
-        neo4j_store.close()
+        await neo4j_store.close()
     logger.info("Services shut down")
 
 
@@ -93,15 +127,17 @@ async def root():
 
 
 @app.post("/api/upload")
-async def upload_documents(files: List[UploadFile] = File(...)):
+async def upload_documents(background_tasks: BackgroundTasks, files: List[UploadFile] = File(...)):
     """
-    Upload and ingest PDF documents.
+    Upload PDF documents and queue them for ingestion.
+    
+    Ingestion runs in the background; poll /api/status/{doc_id} for completion.
     
     Args:
         files: List of PDF files to upload
         
     Returns:
-        List of ingested document IDs
+        List of queued document IDs
     """
     if not document_service:
         raise HTTPException(status_code=500, detail="Document service not initialized")
@@ -118,14 +154,14 @@ async def upload_documents(files: List[UploadFile] = File(...)):
         # Save uploaded file
         file_path = UPLOAD_DIR / file.filename
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            await run_in_threadpool(_save_upload, file, file_path)
             
-            # Ingest document
-            doc_id = document_service.ingest_document(file_path)
+            # Queue ingestion to run after the response is sent
+            doc_id = document_service.register_document(file_path)
+            background_tasks.add_task(document_service.ingest_document_background, file_path)
             doc_ids.append(doc_id)
             
-            logger.info(f"Successfully uploaded and ingested: {file.filename}")
+            logger.info(f"Successfully uploaded and queued: {file.filename}")
         except Exception as e:
             logger.error(f"Error processing {file.filename}: {e}")
             raise HTTPException(
@@ -133,7 +169,31 @@ async def upload_documents(files: List[UploadFile] = File(...)):
                 detail=f"Error processing {file.filename}: {str(e)}"
             )
     
-    return {"document_ids": doc_ids, "message": f"Successfully ingested {len(doc_ids)} document(s)"}
+    return {
+        "document_ids": doc_ids,
+        "status": "processing",
+        "message": f"Accepted {len(doc_ids)} document(s) for ingestion",
+    }
+
+
+@app.get("/api/status/{doc_id}")
+async def document_status(doc_id: str):
+    """
+    Get the ingestion status of an uploaded document.
+    
+    Args:
+        doc_id: Document ID returned by /api/upload
+        
+    Returns:
+        Status record with 'status' of processing, completed, or failed
+    """
+    if not document_service:
+        raise HTTPException(status_code=500, detail="Document service not initialized")
+    
+    status = document_service.get_status(doc_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown document {doc_id}")
+    return status
 
 
 @app.post("/api/query")
@@ -151,7 +211,7 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail="Query service not initialized")
     
     try:
-        result = query_service.process_query(
+        result = await query_service.process_query(
             request.query, 
             top_k=request.top_k, 
             max_hops=request.max_hops
@@ -162,6 +222,47 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
+async def _sse_events(request: QueryRequest) -> AsyncIterator[bytes]:
+    """Encode streamed query events as Server-Sent Events."""
+    async for event in query_service.process_query_stream(
+        request.query,
+        top_k=request.top_k,
+        max_hops=request.max_hops,
+    ):
+        if "delta" in event:
+            yield b"data: " + orjson.dumps({"delta": event["delta"]}) + b"\n\n"
+        elif "error" in event["result"]:
+            # Failed queries end with a distinct event so clients don't treat them as answers
+            yield b"event: error\ndata: " + orjson.dumps(event["result"]) + b"\n\n"
+        else:
+            yield b"event: result\ndata: " + orjson.dumps(event["result"]) + b"\n\n"
+
+
+@app.post("/api/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """
+    Process a query and stream the answer as Server-Sent Events.
+    
+    Each generated piece of the answer is sent as a ``data: {"delta": ...}`` event;
+    the stream ends with an ``event: result`` carrying the same payload as /api/query,
+    or with an ``event: error`` carrying the error result if the query failed.
+    
+    Args:
+        request: Query request with query text and optional parameters
+        
+    Returns:
+        text/event-stream response
+    """
+    if not query_service:
+        raise HTTPException(status_code=500, detail="Query service not initialized")
+    
+    return StreamingResponse(
+        _sse_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/health")
 async def health_check():
     """Detailed health check."""
@@ -173,7 +274,7 @@ async def health_check():
     
     try:
         if neo4j_store:
-            neo4j_store.driver.verify_connectivity()
+            await neo4j_store.driver.verify_connectivity()
             health["neo4j"] = "connected"
     except Exception as e:
         health["neo4j"] = f"error: {str(e)}"
@@ -185,11 +286,12 @@ async def health_check():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=True,
-    )
+    from api.server import run
+    run()
+
+
+
+
+
+
 
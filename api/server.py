@@ -0,0 +1,26 @@
+"""Entry point that serves the FastAPI app with uvicorn."""
+import uvicorn
+from config.settings import settings
+
+
+def run():
+    """Run the API server with the configured host, port and log level."""
+    uvicorn.run(
+        "api.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        reload=settings.dev_mode,
+        # One worker: the embedded Chroma store is per-process, so other workers would
+        # not see each other's vectors (run Chroma as a server before scaling out)
+        workers=1,
+        loop="auto",  # uvloop where installed; it is not available on Windows
+        http="httptools",
+        log_level=settings.log_level.lower(),
+    )
+
+
+
+
+
+
+
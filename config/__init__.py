@@ -1,6 +1,6 @@
 """Configuration module for the Context-Aware Research Assistant."""
-from .settings import Settings, settings
+from .settings import Settings, settings, get_settings
 from . import logger  # Initialize logging
 
-__all__ = ["Settings", "settings"]
+__all__ = ["Settings", "settings", "get_settings"]
 
@@ -1,4 +1,6 @@
 """Application settings and configuration."""
+from functools import lru_cache
+from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,9 @@ class Settings(BaseSettings):
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str
+    neo4j_max_connection_pool_size: int = 64  # Well above document_concurrency (8), so concurrent ingests leave connections for queries
+    neo4j_connection_acquisition_timeout: float = 30.0  # seconds
+    neo4j_max_transaction_retry_time: float = 15.0  # seconds
     
     # OpenAI Configuration
     openai_api_key: str
@@ -17,6 +22,31 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    cors_origins: List[str] = ["*"]  # JSON list in env, e.g. CORS_ORIGINS=["http://localhost:8501"]
+    dev_mode: bool = False  # Auto-reload on code changes
+    
+    # Vector Search Configuration
+    vector_quantization: str = "fp32"  # In-memory search matrix precision: fp32, fp16, or int8
+    use_neo4j_vector: bool = False  # Also store chunk embeddings in Neo4j and search + traverse in one query
+    
+    # Embedding Cache Configuration
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./cache/embeddings.sqlite3"
+    
+    # Query Cache Configuration
+    query_cache_enabled: bool = True
+    query_cache_threshold: float = 0.95  # Cosine similarity for reusing a cached answer
+    query_cache_ttl_seconds: int = 3600
+    query_cache_path: str = "./cache/query_cache.sqlite3"
+    
+    # Ingestion Configuration
+    llm_concurrency: int = 8  # Max concurrent LLM extraction calls (tune to OpenAI RPM/TPM quota)
+    document_concurrency: int = 8  # Max documents ingested concurrently in batch ingestion
+    ingestion_status_path: str = "./cache/ingestion_status.sqlite3"  # Persists across API restarts
+    min_chunk_chars_for_extraction: int = 200  # Shorter chunks skip LLM extraction
+    extraction_cache_enabled: bool = True
+    extraction_cache_threshold: float = 0.97  # Cosine similarity for reusing a cached extraction
+    extraction_cache_path: str = "./cache/extraction_cache"
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -26,8 +56,14 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance (env is parsed once)."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
 
 
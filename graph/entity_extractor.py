@@ -1,10 +1,13 @@
 """Entity and relationship extraction from text chunks."""
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from llama_index.llms.openai import OpenAI
-from llama_index.core import PromptTemplate
 from loguru import logger
 from config.settings import settings
-import json
+from .extraction_cache import SemanticLLMCache
+import orjson
+
+logger = logger.bind(name="EntityExtractor")
 
 
 class EntityExtractor:
@@ -51,78 +54,131 @@ Return ONLY a valid JSON object with this structure:
     ]
 }}"""
 
+    MAX_TEXT_CHARS = 4000  # Limit text length sent to the LLM
+
     def __init__(self):
         """Initialize entity extractor with LLM."""
-        self.logger = logger.bind(name=self.__class__.__name__)
+        self._api_key = settings.openai_api_key
+        
+        # Render the constant template once: unescape the str.format braces and
+        # split around the {text} placeholder so each call is a plain concatenation
+        template = self.ENTITY_EXTRACTION_PROMPT.replace("{{", "{").replace("}}", "}")
+        self._prompt_prefix, self._prompt_suffix = template.split("{text}")
+        
         try:
             self.llm = OpenAI(
-                api_key=settings.openai_api_key,
+                api_key=self._api_key,
                 model="gpt-4o-mini",  # Using mini for cost efficiency
                 temperature=0.0,  # Deterministic extraction
+                # JSON mode: the response is always a bare JSON object (no markdown fences)
+                additional_kwargs={"response_format": {"type": "json_object"}},
             )
         except Exception as e:
-            self.logger.error(f"Failed to initialize LLM: {e}")
+            logger.error(f"Failed to initialize LLM: {e}")
             raise
+        
+        # Semantic cache: near-duplicate chunks reuse a previous extraction. It is keyed by
+        # the chunk embeddings computed for the vector store, so it makes no embedding calls
+        self.cache: Optional[SemanticLLMCache] = None
+        if settings.extraction_cache_enabled:
+            self.cache = SemanticLLMCache(
+                path=settings.extraction_cache_path,
+                threshold=settings.extraction_cache_threshold,
+            )
     
-    def extract(self, text: str, chunk_id: str) -> tuple[List[Dict], List[Dict]]:
+    def save_cache(self):
+        """Persist the semantic extraction cache, if enabled (blocking file I/O)."""
+        if self.cache is not None:
+            self.cache.save()
+    
+    def _is_extractable(self, text: str) -> bool:
+        """Cheap heuristic: skip blank, tiny, or non-alphabetic chunks without calling the LLM."""
+        stripped = text.strip()
+        if len(stripped) < settings.min_chunk_chars_for_extraction:
+            return False
+        return any(c.isalpha() for c in stripped[:200])
+    
+    def _truncate(self, text: str) -> str:
+        """Limit text to MAX_TEXT_CHARS, avoiding a copy when it already fits."""
+        return text if len(text) <= self.MAX_TEXT_CHARS else text[:self.MAX_TEXT_CHARS]
+    
+    def _format_prompt(self, text: str) -> str:
+        """Render the extraction prompt for an already truncated text chunk."""
+        return self._prompt_prefix + text + self._prompt_suffix
+    
+    def _parse_response(self, response_text: str) -> tuple[List[Dict], List[Dict]]:
+        """Parse the raw entities and relationships from the JSON-mode LLM response."""
+        result = orjson.loads(response_text)
+        return result.get("entities", []), result.get("relationships", [])
+    
+    def _scope_ids(
+        self, entities: List[Dict], relationships: List[Dict], chunk_id: str
+    ) -> tuple[List[Dict], List[Dict]]:
+        """Prefix entity and relationship IDs with the chunk ID (mutates in place)."""
+        # Prefix entity IDs with chunk_id to ensure uniqueness
+        for entity in entities:
+            if "id" in entity:
+                entity["id"] = f"{chunk_id}_{entity['id']}"
+        
+        # Update relationship IDs
+        entity_id_map = {e.get("id", ""): e.get("id", "") for e in entities}
+        for rel in relationships:
+            from_id = rel.get("from", "")
+            to_id = rel.get("to", "")
+            if from_id in entity_id_map:
+                rel["from"] = entity_id_map[from_id]
+            else:
+                # If entity not in this chunk, try to find it
+                rel["from"] = f"{chunk_id}_{from_id}"
+            if to_id in entity_id_map:
+                rel["to"] = entity_id_map[to_id]
+            else:
+                rel["to"] = f"{chunk_id}_{to_id}"
+        
+        logger.info(f"Extracted {len(entities)} entities and {len(relationships)} relationships")
+        return entities, relationships
+    
+    async def extract_async(
+        self,
+        text: str,
+        chunk_id: str,
+        embedding: Optional[List[float]] = None,
+        no_cache: bool = False,
+    ) -> tuple[List[Dict], List[Dict]]:
         """
-        Extract entities and relationships from text.
+        Extract entities and relationships from text (async, so several chunks can be
+        extracted concurrently).
         
         Args:
             text: Text chunk to extract from
             chunk_id: ID of the chunk (for entity IDs)
+            embedding: Embedding of the chunk, for the semantic cache (no cache without one)
+            no_cache: Bypass the semantic cache (e.g. for sensitive chunks)
             
         Returns:
             Tuple of (entities list, relationships list)
         """
-        response_text = ""
+        if not self._is_extractable(text):
+            logger.debug("Skipping extraction for chunk {}: too little text", chunk_id)
+            return [], []
+        
         try:
-            self.logger.debug(f"Extracting entities from chunk {chunk_id}")
-            
-            prompt = PromptTemplate(self.ENTITY_EXTRACTION_PROMPT)
-            formatted_prompt = prompt.format(text=text[:4000])  # Limit text length
-            
-            response = self.llm.complete(formatted_prompt)
-            response_text = str(response).strip()
+            logger.debug("Extracting entities from chunk {}", chunk_id)
             
-            # Extract JSON from response (handle markdown code blocks)
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
+            use_cache = self.cache is not None and embedding is not None and not no_cache
+            if use_cache:
+                cached = self.cache.lookup(embedding)
+                if cached is not None:
+                    logger.debug("Semantic cache hit for chunk {}", chunk_id)
+                    return self._scope_ids(*cached, chunk_id)
             
-            result = json.loads(response_text)
+            response = await self.llm.acomplete(self._format_prompt(self._truncate(text)))
+            entities, relationships = self._parse_response(response.text)
             
-            entities = result.get("entities", [])
-            relationships = result.get("relationships", [])
+            if use_cache and self.cache.add(embedding, entities, relationships):
+                await asyncio.to_thread(self.cache.save)
+            return self._scope_ids(entities, relationships, chunk_id)
             
-            # Prefix entity IDs with chunk_id to ensure uniqueness
-            for entity in entities:
-                if "id" in entity:
-                    entity["id"] = f"{chunk_id}_{entity['id']}"
-            
-            # Update relationship IDs
-            entity_id_map = {e.get("id", ""): e.get("id", "") for e in entities}
-            for rel in relationships:
-                from_id = rel.get("from", "")
-                to_id = rel.get("to", "")
-                if from_id in entity_id_map:
-                    rel["from"] = entity_id_map[from_id]
-                else:
-                    # If entity not in this chunk, try to find it
-                    rel["from"] = f"{chunk_id}_{from_id}"
-                if to_id in entity_id_map:
-                    rel["to"] = entity_id_map[to_id]
-                else:
-                    rel["to"] = f"{chunk_id}_{to_id}"
-            
-            self.logger.info(f"Extracted {len(entities)} entities and {len(relationships)} relationships")
-            return entities, relationships
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response: {e}. Response: {response_text[:200] if response_text else 'No response'}")
-            return [], []
         except Exception as e:
-            self.logger.error(f"Error extracting entities: {e}")
+            logger.error(f"Error extracting entities: {e}")
             return [], []
-
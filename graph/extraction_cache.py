@@ -0,0 +1,152 @@
+"""Semantic cache for LLM entity extraction results."""
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+import copy
+import threading
+import numpy as np
+import orjson
+from loguru import logger
+
+
+class SemanticLLMCache:
+    """
+    Caches entity extraction output keyed by chunk embedding.
+    
+    Near-duplicate chunks (headers, disclaimers, repeated sections) reuse the
+    entities/relationships extracted for a previous chunk whose embedding has
+    cosine similarity >= threshold, instead of calling the LLM again.
+    Stored templates keep the raw LLM entity IDs; callers re-scope them to the
+    current chunk.
+    
+    Safe to share between concurrent ingestions; save() may run in a worker thread.
+    """
+    
+    def __init__(self, path: str, threshold: float = 0.97, persist_every: int = 50):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            path: Base path for the persisted cache (".npy" and ".json" are appended)
+            threshold: Minimum cosine similarity for a cache hit
+            persist_every: Entries added between saves (add() reports when one is due)
+        """
+        self.logger = logger.bind(name=self.__class__.__name__)
+        self.path = Path(path)
+        self.threshold = threshold
+        self.persist_every = persist_every
+        
+        self._matrix: Optional[np.ndarray] = None  # Row-normalized embeddings (capacity-doubling buffer)
+        self._size = 0
+        self._templates: List[Tuple[List[Dict], List[Dict]]] = []
+        self._unsaved = 0
+        self._lock = threading.Lock()  # Guards the in-memory state
+        self._save_lock = threading.Lock()  # Serializes writes to disk
+        
+        self._load()
+    
+    @property
+    def _embeddings_path(self) -> Path:
+        return self.path.with_suffix(".npy")
+    
+    @property
+    def _templates_path(self) -> Path:
+        return self.path.with_suffix(".json")
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _load(self):
+        """Load a previously persisted cache, if any."""
+        if not (self._embeddings_path.exists() and self._templates_path.exists()):
+            return
+        try:
+            matrix = np.load(self._embeddings_path)
+            with open(self._templates_path, "rb") as f:
+                templates = [(item["entities"], item["relationships"]) for item in orjson.loads(f.read())]
+            if len(templates) != len(matrix):
+                raise ValueError("embedding and template counts differ")
+            self._matrix = matrix.astype(np.float32)
+            self._size = len(matrix)
+            self._templates = templates
+            self.logger.info(f"Loaded {self._size} cached extractions from {self.path}")
+        except Exception as e:
+            self.logger.warning(f"Could not load extraction cache from {self.path}: {e}")
+    
+    def save(self):
+        """Persist the cache to disk (blocking; call from a worker thread in async code)."""
+        with self._save_lock:
+            # Snapshot under the lock, write outside it so lookups and adds aren't held up.
+            # Templates are never mutated after add(), so a shallow copy of the list suffices
+            with self._lock:
+                if not self._unsaved:
+                    return
+                unsaved = self._unsaved
+                size = self._size
+                matrix = self._matrix[:size].copy()
+                templates = list(self._templates)
+                self._unsaved = 0
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                np.save(self._embeddings_path, matrix)
+                with open(self._templates_path, "wb") as f:
+                    f.write(orjson.dumps([{"entities": e, "relationships": r} for e, r in templates]))
+                self.logger.debug("Persisted {} cached extractions to {}", size, self.path)
+            except Exception as e:
+                with self._lock:
+                    self._unsaved += unsaved
+                self.logger.warning(f"Could not persist extraction cache to {self.path}: {e}")
+    
+    def lookup(self, embedding: List[float]) -> Optional[Tuple[List[Dict], List[Dict]]]:
+        """
+        Find a cached extraction for a near-duplicate chunk.
+        
+        Args:
+            embedding: Embedding of the chunk text
+        
+        Returns:
+            Copy of the cached (entities, relationships) templates, or None on a miss
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            if not self._size:
+                return None
+            
+            scores = self._matrix[:self._size] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            
+            entities, relationships = self._templates[best]
+        return copy.deepcopy(entities), copy.deepcopy(relationships)
+    
+    def add(self, embedding: List[float], entities: List[Dict], relationships: List[Dict]) -> bool:
+        """
+        Store the raw extraction output for a chunk.
+        
+        Args:
+            embedding: Embedding of the chunk text
+            entities: Entities as returned by the LLM (unscoped IDs)
+            relationships: Relationships as returned by the LLM (unscoped IDs)
+        
+        Returns:
+            True if persist_every entries are now unsaved and the caller should save()
+        """
+        vector = self._normalize(embedding)
+        template = (copy.deepcopy(entities), copy.deepcopy(relationships))
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.empty((64, vector.shape[0]), dtype=np.float32)
+            elif self._size == len(self._matrix):
+                grown = np.empty((max(64, 2 * len(self._matrix)), self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix
+                self._matrix = grown
+            
+            self._matrix[self._size] = vector
+            self._size += 1
+            self._templates.append(template)
+            
+            self._unsaved += 1
+            return self._unsaved >= self.persist_every
@@ -1,339 +1,586 @@
 """Neo4j graph database operations."""
-from typing import List, Dict, Optional, Any
-from neo4j import GraphDatabase
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Callable, Awaitable, Tuple
+from neo4j import GraphDatabase, AsyncGraphDatabase, AsyncDriver
 from loguru import logger
 from config.settings import settings
 
+logger = logger.bind(name="Neo4jStore")
+
+# Properties returned as top-level fields rather than inside "metadata"
+_CHUNK_CORE_FIELDS = frozenset(("id", "text", "index"))
+_NODE_CORE_FIELDS = frozenset(("id", "name", "text"))
+
+# Maps characters that are invalid in Cypher parameter names to underscores
+_META_TRANS = str.maketrans({".": "_", ":": "_"})
+
+# Unique constraints for node IDs, plus lookup indexes
+_CONSTRAINTS = (
+    "CREATE CONSTRAINT document_id IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
+    "CREATE CONSTRAINT policy_id IF NOT EXISTS FOR (p:Policy) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT section_id IF NOT EXISTS FOR (s:Section) REQUIRE s.id IS UNIQUE",
+    "CREATE CONSTRAINT topic_id IF NOT EXISTS FOR (t:Topic) REQUIRE t.id IS UNIQUE",
+    "CREATE CONSTRAINT concept_id IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (ch:Chunk) REQUIRE ch.id IS UNIQUE",
+    "CREATE INDEX chunk_content_hash IF NOT EXISTS FOR (ch:Chunk) ON (ch.content_hash)",
+)
+
+# Native vector index over Chunk.embedding (used when settings.use_neo4j_vector is on)
+CHUNK_VECTOR_INDEX = "chunk_embedding"
+EMBEDDING_DIMENSIONS = 1536  # text-embedding-3-small
+_VECTOR_INDEX = (
+    f"CREATE VECTOR INDEX {CHUNK_VECTOR_INDEX} IF NOT EXISTS FOR (ch:Chunk) ON (ch.embedding) "
+    f"OPTIONS {{indexConfig: {{`vector.dimensions`: {EMBEDDING_DIMENSIONS}, `vector.similarity_function`: 'cosine'}}}}"
+)
+
+_PRIMITIVE_TYPES = (str, int, float, bool)
+
+
+def _props(var: str) -> str:
+    """Cypher expression for a node's properties as [key, value] pairs, leaving out the embedding."""
+    return f"[key IN keys({var}) WHERE key <> 'embedding' | [key, {var}[key]]]"
+
+
+def _flatten_metadata(metadata: Dict) -> Dict[str, Any]:
+    """
+    Flatten metadata dictionary to only include primitive values.
+    Neo4j only accepts primitive types (string, int, float, bool) or arrays of primitives.
+    Non-primitive values (dicts, objects) are dropped; lists containing anything
+    other than primitives are converted to lists of strings.
+    """
+    if not isinstance(metadata, dict):
+        return {}
+    
+    flattened = {}
+    for key, value in metadata.items():
+        if value is None or isinstance(value, _PRIMITIVE_TYPES):
+            flattened[key] = value
+        elif isinstance(value, list):
+            if all(item is None or isinstance(item, _PRIMITIVE_TYPES) for item in value):
+                flattened[key] = value
+            else:
+                flattened[key] = [str(item) for item in value]
+    
+    return flattened
+
+
+@lru_cache(maxsize=1)
+def _get_driver() -> AsyncDriver:
+    """Return the process-wide async driver; its connection pool is shared by all Neo4jStore instances."""
+    return AsyncGraphDatabase.driver(
+        settings.neo4j_uri,
+        auth=(settings.neo4j_user, settings.neo4j_password),
+        max_connection_pool_size=settings.neo4j_max_connection_pool_size,
+        connection_acquisition_timeout=settings.neo4j_connection_acquisition_timeout,
+        max_transaction_retry_time=settings.neo4j_max_transaction_retry_time,
+        keep_alive=True,
+    )
+
 
 class Neo4jStore:
     """
     Manages Neo4j graph database operations.
     Stores entities (Document, Policy, Section, Topic, Concept) and relationships.
+    
+    Uses the async driver so Bolt round-trips don't block the event loop;
+    all query methods are coroutines.
     """
     
+    MAX_TRAVERSAL_HOPS = 3
+    
     def __init__(self):
         """Initialize Neo4j connection."""
-        self.logger = logger.bind(name=self.__class__.__name__)
-        self.driver = GraphDatabase.driver(
-            settings.neo4j_uri,
-            auth=(settings.neo4j_user, settings.neo4j_password)
-        )
+        self.driver = _get_driver()
         self._ensure_constraints()
     
-    @staticmethod
-    def _is_primitive(value: Any) -> bool:
-        """Check if a value is a primitive type (string, int, float, bool) or list of primitives."""
-        if value is None:
-            return True
-        if isinstance(value, (str, int, float, bool)):
-            return True
-        if isinstance(value, list):
-            return all(Neo4jStore._is_primitive(item) for item in value)
-        return False
-    
-    @staticmethod
-    def _flatten_metadata(metadata: Dict) -> Dict[str, Any]:
+    def _ensure_constraints(self):
         """
-        Flatten metadata dictionary to only include primitive values.
-        Neo4j only accepts primitive types (string, int, float, bool) or arrays of primitives.
+        Create unique constraints for nodes (synchronously, once at startup, in one transaction).
+        The vector index gets its own transaction so an older server that rejects it
+        still gets the constraints.
         """
-        if not isinstance(metadata, dict):
-            return {}
-        
-        flattened = {}
-        for key, value in metadata.items():
-            # Skip non-primitive values (dicts, objects)
-            if Neo4jStore._is_primitive(value):
-                flattened[key] = value
-            # Convert lists with mixed types to lists of strings
-            elif isinstance(value, list):
-                flattened[key] = [str(item) for item in value]
+        def _run(statements):
+            def _create(tx):
+                for statement in statements:
+                    tx.run(statement).consume()
+            return _create
         
-        return flattened
-    
-    def _ensure_constraints(self):
-        """Create unique constraints for nodes."""
-        with self.driver.session() as session:
-            # Create constraints for unique node IDs
-            constraints = [
-                "CREATE CONSTRAINT document_id IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
-                "CREATE CONSTRAINT policy_id IF NOT EXISTS FOR (p:Policy) REQUIRE p.id IS UNIQUE",
-                "CREATE CONSTRAINT section_id IF NOT EXISTS FOR (s:Section) REQUIRE s.id IS UNIQUE",
-                "CREATE CONSTRAINT topic_id IF NOT EXISTS FOR (t:Topic) REQUIRE t.id IS UNIQUE",
-                "CREATE CONSTRAINT concept_id IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
-                "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (ch:Chunk) REQUIRE ch.id IS UNIQUE",
-            ]
-            
-            for constraint in constraints:
+        try:
+            with GraphDatabase.driver(
+                settings.neo4j_uri,
+                auth=(settings.neo4j_user, settings.neo4j_password)
+            ) as driver, driver.session() as session:
                 try:
-                    session.run(constraint)
+                    session.execute_write(_run(_CONSTRAINTS))
+                    logger.info("Neo4j constraints ensured")
                 except Exception as e:
-                    self.logger.debug(f"Constraint might already exist: {e}")
-        
-        self.logger.info("Neo4j constraints ensured")
+                    logger.warning(f"Could not ensure constraints: {e}")
+                
+                if settings.use_neo4j_vector:
+                    try:
+                        session.execute_write(_run((_VECTOR_INDEX,)))
+                        logger.info(f"Neo4j vector index {CHUNK_VECTOR_INDEX} ensured")
+                    except Exception as e:
+                        logger.warning(f"Could not create vector index {CHUNK_VECTOR_INDEX} (requires Neo4j 5.11+): {e}")
+        except Exception as e:
+            logger.warning(f"Could not ensure constraints: {e}")
+    
+    async def _execute_write(self, work: Callable[[Any], Awaitable[Any]], tx: Optional[Any] = None) -> Any:
+        """
+        Run ``work(tx)`` inside the caller's transaction if one is given,
+        otherwise inside a managed write transaction on a fresh session.
+        """
+        if tx is not None:
+            return await work(tx)
+        async with self.driver.session() as session:
+            return await session.execute_write(work)
     
-    def create_document_node(self, doc_id: str, filename: str, metadata: Dict) -> str:
+    async def execute_write(self, work: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run ``work(tx)`` in one managed write transaction (retried on transient errors).
+        Pass ``tx`` to the create_* methods to batch several writes into a single commit.
+        """
+        return await self._execute_write(work)
+    
+    async def create_document_node(self, doc_id: str, filename: str, metadata: Dict, tx: Optional[Any] = None) -> str:
         """Create a Document node."""
         # Flatten metadata to individual properties (Neo4j doesn't support dict properties)
-        flattened = self._flatten_metadata(metadata)
+        flattened = _flatten_metadata(metadata)
         
-        with self.driver.session() as session:
-            # Build SET clause dynamically for flattened metadata fields
-            set_clauses = ["d.filename = $filename", "d.created_at = datetime()"]
-            params = {"doc_id": doc_id, "filename": filename}
-            
-            # Add flattened metadata fields as individual properties
-            for key, value in flattened.items():
-                # Use a safe parameter name (replace dots/colons with underscores)
-                param_key = f"meta_{key}".replace(".", "_").replace(":", "_")
-                set_clauses.append(f"d.{key} = ${param_key}")
-                params[param_key] = value
-            
-            query = f"""
-            MERGE (d:Document {{id: $doc_id}})
-            SET {', '.join(set_clauses)}
-            RETURN d.id as id
-            """
-            params["doc_id"] = doc_id
-            result = session.run(query, **params)
-            return result.single()["id"]
+        # Build SET clause dynamically for flattened metadata fields
+        set_clauses = ["d.filename = $filename", "d.created_at = datetime()"]
+        params = {"doc_id": doc_id, "filename": filename}
+        
+        # Add flattened metadata fields as individual properties
+        for key, value in flattened.items():
+            # Use a safe parameter name (replace dots/colons with underscores)
+            param_key = ("meta_" + key).translate(_META_TRANS)
+            set_clauses.append(f"d.{key} = ${param_key}")
+            params[param_key] = value
+        
+        query = f"""
+        MERGE (d:Document {{id: $doc_id}})
+        SET {', '.join(set_clauses)}
+        RETURN d.id as id
+        """
+        
+        async def _work(t):
+            result = await t.run(query, **params)
+            record = await result.single()
+            return record["id"]
+        
+        return await self._execute_write(_work, tx)
     
-    def create_chunk_node(self, chunk_id: str, text: str, metadata: Dict, doc_id: str):
-        """Create a Chunk node and link it to Document."""
-        # Flatten metadata to individual properties (Neo4j doesn't support dict properties)
-        flattened = self._flatten_metadata(metadata)
-        
-        with self.driver.session() as session:
-            # Build SET clause dynamically for flattened metadata fields
-            set_clauses = ["ch.text = $text"]
-            params = {
-                "chunk_id": chunk_id,
-                "text": text,
-                "doc_id": doc_id,
+    async def create_chunk_nodes_bulk(self, chunks: List[Dict], doc_id: str, tx: Optional[Any] = None):
+        """
+        Create Chunk nodes for a whole document with a single UNWIND query
+        and link them to the Document.
+        
+        Args:
+            chunks: List of chunk dictionaries with 'id', 'text', 'metadata' and optional
+                'content_hash' and 'embedding'
+            doc_id: ID of the document the chunks belong to
+            tx: Optional open transaction to run in
+        """
+        rows = []
+        for chunk in chunks:
+            metadata = chunk.get("metadata", {})
+            # Flatten metadata to individual properties (Neo4j doesn't support dict properties)
+            meta = {
+                key: value for key, value in _flatten_metadata(metadata).items()
+                if key not in ("chunk_id", "text", "chunk_index")
             }
+            rows.append({
+                "id": chunk["id"],
+                "text": chunk["text"],
+                "index": metadata.get("chunk_index", 0),
+                "content_hash": chunk.get("content_hash"),
+                "embedding": chunk.get("embedding"),
+                "meta": meta,
+            })
+        
+        query = """
+        UNWIND $rows AS row
+        MERGE (ch:Chunk {id: row.id})
+        SET ch += row.meta, ch.text = row.text, ch.index = row.index, ch.content_hash = row.content_hash,
+            ch.embedding = coalesce(row.embedding, ch.embedding)
+        WITH ch
+        MATCH (d:Document {id: $doc_id})
+        MERGE (ch)-[:BELONGS_TO]->(d)
+        """
+        
+        async def _work(t):
+            result = await t.run(query, rows=rows, doc_id=doc_id)
+            await result.consume()
+        
+        await self._execute_write(_work, tx)
+        logger.info(f"Created {len(rows)} chunk nodes for document {doc_id}")
+    
+    async def find_chunks_by_hashes(self, content_hashes: List[str]) -> Dict[str, str]:
+        """
+        Look up existing chunks by content hash in a single query.
+        
+        Args:
+            content_hashes: Content hashes to look up
             
-            # Add chunk_index if available
-            chunk_index = metadata.get("chunk_index", 0)
-            params["chunk_index"] = chunk_index
-            set_clauses.append("ch.index = $chunk_index")
-            
-            # Add flattened metadata fields as individual properties
-            for key, value in flattened.items():
-                # Skip chunk_id, text, and chunk_index as they're handled separately
-                if key in ("chunk_id", "text", "chunk_index"):
-                    continue
-                # Use a safe parameter name
-                param_key = f"meta_{key}".replace(".", "_").replace(":", "_")
-                set_clauses.append(f"ch.{key} = ${param_key}")
-                params[param_key] = value
-            
-            query = f"""
-            MERGE (ch:Chunk {{id: $chunk_id}})
-            SET {', '.join(set_clauses)}
-            WITH ch
-            MATCH (d:Document {{id: $doc_id}})
-            MERGE (ch)-[:BELONGS_TO]->(d)
-            RETURN ch.id as id
-            """
-            result = session.run(query, **params)
-            return result.single()["id"]
+        Returns:
+            Mapping of content hash to the ID of an existing chunk with that content
+        """
+        if not content_hashes:
+            return {}
+        
+        query = """
+        UNWIND $hashes AS h
+        MATCH (ch:Chunk {content_hash: h})
+        RETURN h AS content_hash, min(ch.id) AS id
+        """
+        async with self.driver.session() as session:
+            result = await session.run(query, hashes=content_hashes)
+            return {record["content_hash"]: record["id"] async for record in result}
     
-    def create_entity_nodes(self, entities: List[Dict], chunk_id: str):
+    async def link_chunks_to_document(self, chunk_ids: List[str], doc_id: str, tx: Optional[Any] = None):
         """
-        Create entity nodes (Policy, Section, Topic, Concept) and link to chunk.
+        Link existing Chunk nodes to a Document (used for chunks shared between documents).
         
         Args:
-            entities: List of entity dictionaries with 'type', 'name', 'id', 'properties'
-            chunk_id: ID of the chunk these entities belong to
-        """
-        with self.driver.session() as session:
-            for entity in entities:
-                entity_type = entity.get("type")
-                entity_id = entity.get("id")
-                entity_name = entity.get("name", "")
-                properties = entity.get("properties", {})
-                
-                if not entity_type or not entity_id:
-                    continue
-                
-                # Flatten properties to individual fields (Neo4j doesn't support dict properties)
-                flattened_props = self._flatten_metadata(properties)
-                
-                # Build SET clause dynamically
-                set_clauses = ["e.name = $name"]
-                params = {
-                    "entity_id": entity_id,
-                    "name": entity_name,
-                    "chunk_id": chunk_id,
-                }
-                
-                # Add flattened properties as individual fields
-                for key, value in flattened_props.items():
-                    param_key = f"prop_{key}".replace(".", "_").replace(":", "_")
-                    set_clauses.append(f"e.{key} = ${param_key}")
-                    params[param_key] = value
-                
+            chunk_ids: IDs of existing chunks
+            doc_id: ID of the document that also contains them
+            tx: Optional open transaction to run in
+        """
+        query = """
+        UNWIND $chunk_ids AS chunk_id
+        MATCH (ch:Chunk {id: chunk_id})
+        MATCH (d:Document {id: $doc_id})
+        MERGE (ch)-[:BELONGS_TO]->(d)
+        """
+        
+        async def _work(t):
+            result = await t.run(query, chunk_ids=chunk_ids, doc_id=doc_id)
+            await result.consume()
+        
+        await self._execute_write(_work, tx)
+        logger.info(f"Linked {len(chunk_ids)} existing chunks to document {doc_id}")
+    
+    async def remove_stale_chunks(self, doc_id: str, keep_ids: List[str], tx: Optional[Any] = None) -> List[str]:
+        """
+        Unlink chunks that are no longer part of a document (e.g. after re-ingesting a
+        revised PDF), deleting those left without any document together with the
+        entities only they mentioned.
+        
+        Args:
+            doc_id: ID of the document
+            keep_ids: IDs of the chunks the document now consists of
+            tx: Optional open transaction to run in
+        
+        Returns:
+            IDs of the deleted chunks
+        """
+        unlink_query = """
+        MATCH (ch:Chunk)-[r:BELONGS_TO]->(:Document {id: $doc_id})
+        WHERE NOT ch.id IN $keep_ids
+        DELETE r
+        WITH DISTINCT ch
+        WHERE NOT EXISTS { (ch)-[:BELONGS_TO]->(:Document) }
+        RETURN ch.id AS id
+        """
+        delete_query = """
+        UNWIND $ids AS id
+        MATCH (ch:Chunk {id: id})
+        OPTIONAL MATCH (e)-[:MENTIONED_IN]->(ch)
+        DETACH DELETE ch
+        WITH DISTINCT e
+        WHERE e IS NOT NULL AND NOT EXISTS { (e)-[:MENTIONED_IN]->() }
+        DETACH DELETE e
+        """
+        
+        async def _work(t):
+            result = await t.run(unlink_query, doc_id=doc_id, keep_ids=keep_ids)
+            ids = [record["id"] async for record in result]
+            if ids:
+                result = await t.run(delete_query, ids=ids)
+                await result.consume()
+            return ids
+        
+        ids = await self._execute_write(_work, tx)
+        if ids:
+            logger.info(f"Removed {len(ids)} stale chunks of document {doc_id}")
+        return ids
+    
+    async def create_entity_nodes_bulk(self, entities: List[Dict], tx: Optional[Any] = None):
+        """
+        Create entity nodes for many chunks at once and link each to its chunk.
+        
+        Entities are grouped by type (labels can't be parameterized) and each
+        group is written with a single UNWIND query, whatever the number of chunks.
+        
+        Args:
+            entities: List of entity dictionaries with 'type', 'name', 'id', 'properties', 'chunk_id'
+            tx: Optional open transaction to run in
+        """
+        rows_by_type: Dict[str, List[Dict]] = defaultdict(list)
+        for entity in entities:
+            entity_type = entity.get("type")
+            entity_id = entity.get("id")
+            
+            if not entity_type or not entity_id:
+                continue
+            
+            # Flatten properties to individual fields (Neo4j doesn't support dict properties)
+            rows_by_type[entity_type].append({
+                "id": entity_id,
+                "name": entity.get("name", ""),
+                "props": _flatten_metadata(entity.get("properties", {})),
+                "chunk_id": entity.get("chunk_id"),
+            })
+        
+        async def _work(t):
+            for entity_type, rows in rows_by_type.items():
                 query = f"""
-                MERGE (e:{entity_type} {{id: $entity_id}})
-                SET {', '.join(set_clauses)}
-                WITH e
-                MATCH (ch:Chunk {{id: $chunk_id}})
+                UNWIND $rows AS row
+                MERGE (e:{entity_type} {{id: row.id}})
+                SET e += row.props, e.name = row.name
+                WITH e, row
+                MATCH (ch:Chunk {{id: row.chunk_id}})
                 MERGE (e)-[:MENTIONED_IN]->(ch)
-                RETURN e.id as id
                 """
-                
-                session.run(query, **params)
+                result = await t.run(query, rows=rows)
+                await result.consume()
         
-        self.logger.info(f"Created {len(entities)} entity nodes for chunk {chunk_id}")
+        await self._execute_write(_work, tx)
+        logger.info(f"Created {len(entities)} entity nodes")
     
-    def create_relationships(self, relationships: List[Dict]):
+    async def create_relationships(self, relationships: List[Dict], tx: Optional[Any] = None):
         """
         Create relationships between entities.
         
+        Relationships are grouped by type (relationship types can't be
+        parameterized) and each group is written with a single UNWIND query.
+        
         Args:
             relationships: List of relationship dicts with 'from', 'to', 'type', 'properties'
+            tx: Optional open transaction to run in
         """
-        with self.driver.session() as session:
-            for rel in relationships:
-                from_id = rel.get("from")
-                to_id = rel.get("to")
-                rel_type = rel.get("type", "RELATES_TO")
-                properties = rel.get("properties", {})
-                
-                if not from_id or not to_id:
-                    continue
-                
-                # Flatten properties to individual fields (Neo4j doesn't support dict properties)
-                flattened_props = self._flatten_metadata(properties)
-                
-                # Build SET clause dynamically (only if there are properties)
-                params = {
-                    "from_id": from_id,
-                    "to_id": to_id,
-                }
-                
-                if flattened_props:
-                    set_clauses = []
-                    for key, value in flattened_props.items():
-                        param_key = f"prop_{key}".replace(".", "_").replace(":", "_")
-                        set_clauses.append(f"r.{key} = ${param_key}")
-                        params[param_key] = value
-                    
-                    query = f"""
-                    MATCH (a {{id: $from_id}}), (b {{id: $to_id}})
-                    MERGE (a)-[r:{rel_type}]->(b)
-                    SET {', '.join(set_clauses)}
-                    RETURN r
-                    """
-                else:
-                    # No properties, just create the relationship
-                    query = f"""
-                    MATCH (a {{id: $from_id}}), (b {{id: $to_id}})
-                    MERGE (a)-[r:{rel_type}]->(b)
-                    RETURN r
-                    """
-                
-                session.run(query, **params)
-        
-        self.logger.info(f"Created {len(relationships)} relationships")
-    
-    def get_chunks_by_ids(self, chunk_ids: List[str]) -> List[Dict]:
-        """Retrieve chunks by their IDs."""
-        with self.driver.session() as session:
-            # Get all properties and reconstruct metadata dict (metadata was flattened to individual properties)
-            query = """
-            MATCH (ch:Chunk)
-            WHERE ch.id IN $chunk_ids
-            OPTIONAL MATCH (ch)-[:BELONGS_TO]->(d:Document)
-            RETURN ch.id as id, ch.text as text, properties(ch) as props,
-                   d.filename as document_filename
-            """
-            result = session.run(query, chunk_ids=chunk_ids)
+        rows_by_type: Dict[str, List[Dict]] = defaultdict(list)
+        for rel in relationships:
+            from_id = rel.get("from")
+            to_id = rel.get("to")
             
-            # Reconstruct metadata dict from properties (excluding core fields)
-            chunks = []
-            for record in result:
-                props = dict(record["props"])
-                # Core fields
-                chunk_id = props.pop("id", record["id"])
-                text = props.pop("text", record["text"])
-                index = props.pop("index", None)
-                
-                # Everything else is metadata
-                metadata = props.copy()
-                if index is not None:
-                    metadata["chunk_index"] = index
-                
-                chunks.append({
-                    "id": chunk_id,
-                    "text": text,
-                    "metadata": metadata,
-                    "document_filename": record["document_filename"],
-                })
+            if not from_id or not to_id:
+                continue
             
-            return chunks
+            # Flatten properties to individual fields (Neo4j doesn't support dict properties)
+            rows_by_type[rel.get("type", "RELATES_TO")].append({
+                "from": from_id,
+                "to": to_id,
+                "props": _flatten_metadata(rel.get("properties", {})),
+            })
+        
+        async def _work(t):
+            for rel_type, rows in rows_by_type.items():
+                query = f"""
+                UNWIND $rows AS row
+                MATCH (a {{id: row.from}}), (b {{id: row.to}})
+                MERGE (a)-[r:{rel_type}]->(b)
+                SET r += row.props
+                """
+                result = await t.run(query, rows=rows)
+                await result.consume()
+        
+        await self._execute_write(_work, tx)
+        logger.info(f"Created {len(relationships)} relationships")
     
-    def traverse_from_chunks(self, chunk_ids: List[str], max_hops: int = 2) -> List[Dict]:
+    @staticmethod
+    def _chunk_record(
+        chunk_id: str, text: str, chunk_index: Optional[int], props: Dict, document_filename: Optional[str]
+    ) -> Dict:
+        """Build a chunk dict, reconstructing metadata from the flattened node properties."""
+        metadata = {key: value for key, value in props.items() if key not in _CHUNK_CORE_FIELDS}
+        if chunk_index is not None:
+            metadata["chunk_index"] = chunk_index
+        return {
+            "id": chunk_id,
+            "text": text,
+            "metadata": metadata,
+            "document_filename": document_filename,
+        }
+    
+    async def traverse_with_chunks(
+        self, chunk_ids: List[str], max_hops: int = 2, limit: int = 100
+    ) -> Tuple[List[Dict], List[Dict]]:
         """
-        Traverse graph from initial chunks to find related context.
+        Traverse graph from initial chunks to find related context, returning the
+        full related chunks in the same round-trip.
         This is the graph traversal part of GraphRAG.
         
+        The expansion is limited per start chunk inside a subquery, so Neo4j
+        stops walking a high-degree neighborhood once enough nodes are found
+        instead of expanding it fully and truncating afterwards.
+        
         Args:
             chunk_ids: Initial chunk IDs from vector search
-            max_hops: Maximum number of relationship hops
+            max_hops: Maximum number of relationship hops (clamped to 1..MAX_TRAVERSAL_HOPS)
+            limit: Maximum number of related nodes to return
             
         Returns:
-            List of related nodes with their types and relationships
-        """
-        with self.driver.session() as session:
-            # Get all properties and reconstruct metadata dict (metadata was flattened to individual properties)
-            query = f"""
-            MATCH path = (ch:Chunk)-[*1..{max_hops}]-(related)
-            WHERE ch.id IN $chunk_ids
-            WITH DISTINCT related, ch
-            RETURN related.id as id,
-                   labels(related) as labels,
-                   related.name as name,
-                   related.text as text,
-                   properties(related) as props,
-                   ch.id as source_chunk_id
-            LIMIT 100
-            """
-            result = session.run(query, chunk_ids=chunk_ids)
-            
-            # Reconstruct metadata dict from properties
-            nodes = []
-            for record in result:
-                props = dict(record["props"])
-                # Core fields
-                node_id = props.pop("id", record["id"])
-                name = props.pop("name", record.get("name"))
-                text = props.pop("text", record.get("text"))
-                
-                # Everything else is metadata
-                metadata = props.copy()
-                
-                nodes.append({
-                    "id": node_id,
-                    "labels": record["labels"],
-                    "name": name,
-                    "text": text,
-                    "metadata": metadata,
-                    "source_chunk_id": record["source_chunk_id"],
-                })
+            (related nodes with their types and relationships,
+             related Chunk nodes as built by _chunk_record, deduplicated)
+        """
+        # Variable-length bounds can't be query parameters; clamping to a small
+        # int keeps the interpolation safe and bounds the number of cached plans
+        hops = max(1, min(int(max_hops), self.MAX_TRAVERSAL_HOPS))
+        per_chunk_limit = max(1, -(-limit // max(len(chunk_ids), 1)))  # ceil(limit / chunks)
+        
+        # Get all properties and reconstruct metadata dict (metadata was flattened to individual properties)
+        query = f"""
+        MATCH (ch:Chunk)
+        WHERE ch.id IN $chunk_ids
+        CALL {{
+            WITH ch
+            MATCH (ch)-[*1..{hops}]-(related)
+            WHERE related <> ch
+            RETURN DISTINCT related
+            LIMIT $per_chunk_limit
+        }}
+        WITH ch, related
+        LIMIT $limit
+        OPTIONAL MATCH (related:Chunk)-[:BELONGS_TO]->(d:Document)
+        WITH ch, related, head(collect(d.filename)) as document_filename
+        RETURN related.id as id,
+               labels(related) as labels,
+               related.name as name,
+               related.text as text,
+               related.index as chunk_index,
+               {_props("related")} as props,
+               ch.id as source_chunk_id,
+               document_filename
+        """
+        
+        async def _work(t):
+            result = await t.run(query, chunk_ids=chunk_ids, per_chunk_limit=per_chunk_limit, limit=limit)
+            return [record async for record in result]
+        
+        async with self.driver.session() as session:
+            records = await session.execute_read(_work)
+        
+        # Reconstruct metadata dict from properties in one pass (excluding core fields)
+        return self._collect_related(records)
+    
+    def _collect_related(self, related: List[Any]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Build graph context nodes and deduplicated related chunks from traversal rows.
+        Related chunks are also put in the chunk cache.
+        """
+        nodes = []
+        chunks: Dict[str, Dict] = {}
+        for record in related:
+            props = dict(record["props"])
+            nodes.append({
+                "id": record["id"],
+                "labels": record["labels"],
+                "name": record["name"],
+                "text": record["text"],
+                "metadata": {key: value for key, value in props.items() if key not in _NODE_CORE_FIELDS},
+                "source_chunk_id": record["source_chunk_id"],
+            })
+            if "Chunk" in record["labels"] and record["id"] not in chunks:
+                chunk = self._chunk_record(
+                    record["id"], record["text"], record["chunk_index"], props, record["document_filename"]
+                )
+                chunks[chunk["id"]] = chunk
+        
+        return nodes, list(chunks.values())
+    
+    async def vector_search_with_traversal(
+        self, embedding: List[float], top_k: int = 5, max_hops: int = 2, limit: int = 100
+    ) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """
+        Vector search over the Chunk embedding index and graph traversal from the
+        hits in a single query (requires settings.use_neo4j_vector).
+        
+        Args:
+            embedding: Query embedding
+            top_k: Number of chunks to find by similarity
+            max_hops: Maximum number of relationship hops (clamped to 1..MAX_TRAVERSAL_HOPS)
+            limit: Maximum number of related nodes to return
             
-            return nodes
+        Returns:
+            (vector results in VectorStore.similarity_search format,
+             related nodes as in traverse_with_chunks, related chunks as in traverse_with_chunks)
+        """
+        hops = max(1, min(int(max_hops), self.MAX_TRAVERSAL_HOPS))
+        per_chunk_limit = max(1, -(-limit // max(top_k, 1)))  # ceil(limit / chunks)
+        
+        query = f"""
+        CALL db.index.vector.queryNodes($index_name, $top_k, $embedding) YIELD node AS ch, score
+        OPTIONAL MATCH (ch)-[:BELONGS_TO]->(d:Document)
+        WITH ch, score, head(collect(d.filename)) as document_filename
+        CALL {{
+            WITH ch
+            OPTIONAL MATCH (ch)-[*1..{hops}]-(related)
+            WHERE related <> ch
+            WITH DISTINCT ch, related
+            LIMIT $per_chunk_limit
+            OPTIONAL MATCH (related:Chunk)-[:BELONGS_TO]->(rd:Document)
+            WITH ch, related, head(collect(rd.filename)) as related_filename
+            RETURN collect(CASE WHEN related IS NULL THEN null ELSE {{
+                id: related.id,
+                labels: labels(related),
+                name: related.name,
+                text: related.text,
+                chunk_index: related.index,
+                props: {_props("related")},
+                source_chunk_id: ch.id,
+                document_filename: related_filename
+            }} END) as related_nodes
+        }}
+        RETURN ch.id as id, ch.text as text, ch.index as chunk_index,
+               {_props("ch")} as props, document_filename, score, related_nodes
+        ORDER BY score DESC
+        """
+        
+        async def _work(t):
+            result = await t.run(
+                query,
+                index_name=CHUNK_VECTOR_INDEX,
+                top_k=top_k,
+                embedding=embedding,
+                per_chunk_limit=per_chunk_limit,
+            )
+            return [record async for record in result]
+        
+        async with self.driver.session() as session:
+            records = await session.execute_read(_work)
+        
+        vector_results = []
+        related = []
+        for record in records:
+            chunk = self._chunk_record(
+                record["id"], record["text"], record["chunk_index"], dict(record["props"]), record["document_filename"]
+            )
+            vector_results.append({
+                "text": chunk["text"],
+                "metadata": {**chunk["metadata"], "chunk_id": chunk["id"]},
+                "score": record["score"],
+                "node_id": chunk["id"],
+            })
+            related.extend(record["related_nodes"])
+        
+        graph_context, graph_chunks = self._collect_related(related[:limit])
+        return vector_results, graph_context, graph_chunks
     
-    def clear_all(self):
+    async def clear_all(self):
         """Clear all nodes and relationships (for testing/reset)."""
-        with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
-        self.logger.warning("Cleared all nodes and relationships from Neo4j")
+        async with self.driver.session() as session:
+            result = await session.run("MATCH (n) DETACH DELETE n")
+            await result.consume()
+        logger.warning("Cleared all nodes and relationships from Neo4j")
     
-    def close(self):
+    async def close(self):
         """Close Neo4j driver connection."""
-        self.driver.close()
-        self.logger.info("Neo4j connection closed")
+        await self.driver.close()
+        _get_driver.cache_clear()
+        logger.info("Neo4j connection closed")
 
 
 
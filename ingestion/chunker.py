@@ -1,10 +1,11 @@
 """Document chunking functionality."""
 from typing import List, Dict
+import hashlib
 from llama_index.core import Document as LlamaDocument
 from llama_index.core.node_parser import SemanticSplitterNodeParser
-from llama_index.embeddings.openai import OpenAIEmbedding
 from loguru import logger
 from config.settings import settings
+from retrieval.embedding_cache import create_embedding_model
 
 
 class DocumentChunker:
@@ -13,6 +14,10 @@ class DocumentChunker:
     Uses semantic splitting to preserve context across boundaries.
     """
     
+    EMBED_BATCH_SIZE = 256  # Sentences per embedding API request during semantic splitting
+    EMBED_MAX_RETRIES = 5  # Retries with exponential backoff per batch request
+    EMBED_TIMEOUT = 60.0  # Seconds per batch request
+    
     def __init__(self, chunk_size: int = 1024, chunk_overlap: int = 200):
         """
         Initialize document chunker.
@@ -25,11 +30,16 @@ class DocumentChunker:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
-        # Initialize embedding model for semantic splitting
+        # Initialize embedding model for semantic splitting.
+        # The splitter embeds all sentence groups through get_text_embedding_batch, so a
+        # large batch size turns hundreds of requests into a few.
         try:
-            self.embedding_model = OpenAIEmbedding(
+            self.embedding_model = create_embedding_model(
                 api_key=settings.openai_api_key,
-                model="text-embedding-3-small"
+                model="text-embedding-3-small",
+                embed_batch_size=self.EMBED_BATCH_SIZE,
+                max_retries=self.EMBED_MAX_RETRIES,
+                timeout=self.EMBED_TIMEOUT,
             )
             
             # Use semantic splitter for better context preservation
@@ -39,13 +49,18 @@ class DocumentChunker:
                 embed_model=self.embedding_model,
             )
         except Exception as e:
-            self.logger.warning(f"Could not initialize semantic splitter: {e}. Using simple splitter.")
+            self.logger.warning("Could not initialize semantic splitter: {}. Using simple splitter.", e)
             from llama_index.core.node_parser import SimpleNodeParser
             self.node_parser = SimpleNodeParser.from_defaults(
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap,
             )
     
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Content-address a chunk by its text."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    
     def chunk_document(self, text: str, metadata: Dict) -> List[LlamaDocument]:
         """
         Chunk a document into semantically meaningful pieces.
@@ -58,7 +73,7 @@ class DocumentChunker:
             List of LlamaDocument chunks with metadata
         """
         try:
-            self.logger.info(f"Chunking document: {metadata.get('filename', 'unknown')}")
+            self.logger.info("Chunking document: {}", metadata.get("filename", "unknown"))
             
             # Create LlamaIndex document
             llama_doc = LlamaDocument(
@@ -74,7 +89,8 @@ class DocumentChunker:
             for idx, node in enumerate(nodes):
                 chunk_metadata = {
                     **metadata,
-                    "chunk_id": f"{metadata.get('filename', 'doc')}_chunk_{idx}",
+                    # Content-addressed, so a revised document never reuses the ID of different text
+                    "chunk_id": f"chunk_{self.content_hash(node.text)}",
                     "chunk_index": idx,
                     "total_chunks": len(nodes),
                 }
@@ -85,11 +101,11 @@ class DocumentChunker:
                 )
                 chunks.append(chunk_doc)
             
-            self.logger.info(f"Created {len(chunks)} chunks from document")
+            self.logger.info("Created {} chunks from document", len(chunks))
             return chunks
             
         except Exception as e:
-            self.logger.error(f"Error chunking document: {str(e)}")
+            self.logger.error("Error chunking document: {}", e)
             raise
 
 
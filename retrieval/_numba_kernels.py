@@ -0,0 +1,81 @@
+"""Numba-compiled kernels for vector search, with NumPy fallbacks."""
+from typing import Tuple
+import numpy as np
+from loguru import logger
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Optional dependency: fall back to NumPy
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _topk_select(scores, k):
+        """Quickselect the k largest scores (Hoare partition), then sort just those k."""
+        n = scores.shape[0]
+        idx = np.arange(n)
+        lo, hi = 0, n - 1
+        while lo < hi:
+            pivot = scores[idx[(lo + hi) // 2]]
+            i, j = lo, hi
+            while i <= j:
+                while scores[idx[i]] > pivot:
+                    i += 1
+                while scores[idx[j]] < pivot:
+                    j -= 1
+                if i <= j:
+                    tmp = idx[i]
+                    idx[i] = idx[j]
+                    idx[j] = tmp
+                    i += 1
+                    j -= 1
+            if k - 1 <= j:
+                hi = j
+            elif k - 1 >= i:
+                lo = i
+            else:
+                break
+        top = idx[:k].copy()
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+
+def topk_partition(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores.
+    
+    Args:
+        scores: 1-D array of similarity scores
+        k: Number of results
+    
+    Returns:
+        (indices, scores) of the top k, best first
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    
+    if NUMBA_AVAILABLE:
+        return _topk_select(np.ascontiguousarray(scores), k)
+    
+    top = np.argpartition(scores, -k)[-k:]
+    top = top[np.argsort(scores[top])[::-1]]
+    return top, scores[top]
+
+
+def warmup():
+    """Compile the kernels ahead of the first query (no-op without Numba)."""
+    if not NUMBA_AVAILABLE:
+        logger.info("Numba not installed; using NumPy top-k selection")
+        return
+    for dtype in (np.float32, np.float64):
+        topk_partition(np.arange(16, dtype=dtype), 4)
+    logger.info("Numba kernels compiled")
+
+
+
+
+
+
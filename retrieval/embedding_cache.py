@@ -0,0 +1,162 @@
+"""Persistent local cache for OpenAI embeddings."""
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.embeddings.openai import OpenAIEmbedding
+from loguru import logger
+from config.settings import settings
+
+Embedding = List[float]
+
+# Keep IN (...) lookups under SQLite's bound-parameter limit
+_LOOKUP_BATCH_SIZE = 500
+
+
+class CachedOpenAIEmbedding(OpenAIEmbedding):
+    """
+    OpenAI embedding model backed by a content-addressed SQLite cache.
+    
+    Vectors are keyed by hash(model, text), so re-ingesting a document or
+    repeating a query never pays for the same embedding twice. Only texts
+    missing from the cache are sent to the API.
+    """
+    
+    _cache_path: str = PrivateAttr()
+    _conn: sqlite3.Connection = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    
+    def __init__(self, cache_path: str, **kwargs):
+        """
+        Initialize cached embedding model.
+        
+        Args:
+            cache_path: Path to the SQLite cache file
+            **kwargs: Passed through to OpenAIEmbedding
+        """
+        super().__init__(**kwargs)
+        self._cache_path = cache_path
+        self._lock = threading.Lock()
+        
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        # Shared across worker threads; access is serialized by self._lock
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb_cache (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedOpenAIEmbedding"
+    
+    def _key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _lookup(self, texts: List[str]) -> Dict[str, Embedding]:
+        """Return cached vectors for the given texts, keyed by text."""
+        keys = {self._key(text): text for text in texts}
+        found: Dict[str, Embedding] = {}
+        key_list = list(keys)
+        with self._lock:
+            for start in range(0, len(key_list), _LOOKUP_BATCH_SIZE):
+                batch = key_list[start:start + _LOOKUP_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM emb_cache WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+    
+    def _store(self, texts: List[str], embeddings: List[Embedding]):
+        """Insert freshly computed vectors into the cache."""
+        rows = [
+            (self._key(text), sqlite3.Binary(np.asarray(embedding, dtype=np.float32).tobytes()))
+            for text, embedding in zip(texts, embeddings)
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO emb_cache (key, vector) VALUES (?, ?)", rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write embeddings to cache {self._cache_path}: {e}")
+    
+    def _partition(self, texts: List[str]):
+        """Split texts into cached vectors and the unique texts that still need embedding."""
+        cached = self._lookup(texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in cached))
+        if texts:
+            logger.debug("Embedding cache: {}/{} hits", len(texts) - len(missing), len(texts))
+        return cached, missing
+    
+    def _embed_cached(self, texts: List[str], embed: Callable[[List[str]], List[Embedding]]) -> List[Embedding]:
+        cached, missing = self._partition(texts)
+        if missing:
+            fresh = embed(missing)
+            self._store(missing, fresh)
+            cached.update(zip(missing, fresh))
+        return [cached[text] for text in texts]
+    
+    async def _aembed_cached(
+        self, texts: List[str], embed: Callable[[List[str]], Awaitable[List[Embedding]]]
+    ) -> List[Embedding]:
+        cached, missing = self._partition(texts)
+        if missing:
+            fresh = await embed(missing)
+            self._store(missing, fresh)
+            cached.update(zip(missing, fresh))
+        return [cached[text] for text in texts]
+    
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._embed_cached([text], super()._get_text_embeddings)[0]
+    
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._embed_cached(texts, super()._get_text_embeddings)
+    
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed_cached(
+            [query], lambda queries: [OpenAIEmbedding._get_query_embedding(self, queries[0])]
+        )[0]
+    
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aembed_cached([text], super()._aget_text_embeddings))[0]
+    
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self._aembed_cached(texts, super()._aget_text_embeddings)
+    
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        async def _embed(queries: List[str]) -> List[Embedding]:
+            return [await OpenAIEmbedding._aget_query_embedding(self, queries[0])]
+        
+        return (await self._aembed_cached([query], _embed))[0]
+
+
+def create_embedding_model(**kwargs) -> OpenAIEmbedding:
+    """
+    Create an OpenAI embedding model, backed by the local cache when enabled.
+    
+    Args:
+        **kwargs: Passed through to OpenAIEmbedding
+    
+    Returns:
+        Embedding model instance
+    """
+    if settings.embedding_cache_enabled:
+        try:
+            return CachedOpenAIEmbedding(cache_path=settings.embedding_cache_path, **kwargs)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache unavailable ({e}); embeddings will not be cached")
+    return OpenAIEmbedding(**kwargs)
+
+
+
+
+
+
+
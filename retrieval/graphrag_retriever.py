@@ -1,6 +1,8 @@
 """GraphRAG-style retrieval combining vector search and graph traversal."""
+import asyncio
 from typing import List, Dict
 from loguru import logger
+from config.settings import settings
 from .vector_store import VectorStore
 from graph.neo4j_store import Neo4jStore
 
@@ -25,7 +27,7 @@ class GraphRAGRetriever:
         self.vector_store = vector_store
         self.neo4j_store = neo4j_store
     
-    def retrieve(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
+    async def retrieve(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
         """
         Perform GraphRAG retrieval: vector search + graph traversal.
         
@@ -42,10 +44,13 @@ class GraphRAGRetriever:
         Returns:
             Dictionary with 'vector_results' and 'graph_context'
         """
+        if settings.use_neo4j_vector:
+            return await self._retrieve_neo4j(query, top_k=top_k, max_hops=max_hops)
+        
         # Step 1: Vector similarity search
         # This finds chunks semantically similar to the query
-        self.logger.info(f"Step 1: Vector similarity search for query: {query}")
-        vector_results = self.vector_store.similarity_search(query, top_k=top_k)
+        self.logger.debug("Step 1: Vector similarity search for query: {}", query)
+        vector_results = await asyncio.to_thread(self.vector_store.similarity_search_fast, query, top_k=top_k)
         
         if not vector_results:
             self.logger.warning("No vector results found")
@@ -57,26 +62,42 @@ class GraphRAGRetriever:
         
         # Step 2: Extract chunk IDs from vector results
         chunk_ids = self.vector_store.get_chunk_ids_from_results(vector_results)
-        self.logger.info(f"Found {len(chunk_ids)} relevant chunks: {chunk_ids}")
+        self.logger.debug("Found {} relevant chunks: {}", len(chunk_ids), chunk_ids)
         
         # Step 3: Graph traversal (multi-hop exploration)
-        # This expands context by following relationships in the graph
-        self.logger.info(f"Step 2: Graph traversal from {len(chunk_ids)} chunks (max {max_hops} hops)")
-        graph_context = self.neo4j_store.traverse_from_chunks(chunk_ids, max_hops=max_hops)
-        self.logger.info(f"Found {len(graph_context)} related nodes via graph traversal")
+        # This expands context by following relationships in the graph; the full texts of
+        # related chunks come back in the same query
+        self.logger.debug("Step 2: Graph traversal from {} chunks (max {} hops)", len(chunk_ids), max_hops)
+        graph_context, graph_chunks = await self.neo4j_store.traverse_with_chunks(chunk_ids, max_hops=max_hops)
+        self.logger.debug("Found {} related nodes via graph traversal", len(graph_context))
+        
+        # Step 4: Combine results
+        return self._combine(vector_results, chunk_ids, graph_context, graph_chunks)
+    
+    async def _retrieve_neo4j(self, query: str, top_k: int, max_hops: int) -> Dict:
+        """Vector search and graph traversal as a single Neo4j query over the chunk vector index."""
+        self.logger.debug("Vector search + graph traversal in Neo4j for query: {}", query)
+        embedding = await self.vector_store.embedding_model.aget_query_embedding(query)
+        vector_results, graph_context, graph_chunks = await self.neo4j_store.vector_search_with_traversal(
+            embedding, top_k=top_k, max_hops=max_hops
+        )
         
-        # Step 4: Get full chunk texts for graph nodes that reference chunks
-        graph_chunk_ids = [
-            item["id"] for item in graph_context 
-            if "Chunk" in item.get("labels", [])
-        ]
-        if graph_chunk_ids:
-            graph_chunks = self.neo4j_store.get_chunks_by_ids(graph_chunk_ids)
-        else:
-            graph_chunks = []
+        if not vector_results:
+            self.logger.warning("No vector results found")
+            return {
+                "vector_results": [],
+                "graph_context": [],
+                "combined_context": [],
+            }
         
-        # Step 5: Combine results
-        # Vector results are the primary context, graph provides expansion
+        chunk_ids = self.vector_store.get_chunk_ids_from_results(vector_results)
+        self.logger.debug("Found {} relevant chunks and {} related nodes", len(chunk_ids), len(graph_context))
+        return self._combine(vector_results, chunk_ids, graph_context, graph_chunks)
+    
+    def _combine(
+        self, vector_results: List[Dict], chunk_ids: List[str], graph_context: List[Dict], graph_chunks: List[Dict]
+    ) -> Dict:
+        """Combine vector hits (primary context) with graph expansion."""
         combined_context = []
         
         # Add vector results (primary)
@@ -89,9 +110,10 @@ class GraphRAGRetriever:
             })
         
         # Add graph chunks (expansion)
+        vector_chunk_ids = set(chunk_ids)
         for chunk in graph_chunks:
             # Avoid duplicates
-            if chunk["id"] not in chunk_ids:
+            if chunk["id"] not in vector_chunk_ids:
                 combined_context.append({
                     "source": "graph",
                     "text": chunk.get("text", ""),
@@ -110,7 +132,10 @@ class GraphRAGRetriever:
                     "text": item.get("text", ""),
                 })
         
-        self.logger.info(f"Retrieved {len(combined_context)} total context items")
+        self.logger.info(
+            "Retrieved {} total context items ({} vector results, {} graph nodes)",
+            len(combined_context), len(vector_results), len(graph_context),
+        )
         
         return {
             "vector_results": vector_results,
@@ -1,7 +1,7 @@
 """Query engine that synthesizes answers using retrieved context."""
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import io
 from llama_index.llms.openai import OpenAI
-from llama_index.core import PromptTemplate
 from loguru import logger
 from config.settings import settings
 from .graphrag_retriever import GraphRAGRetriever
@@ -31,6 +31,9 @@ Provide a comprehensive answer that:
 - Cites specific document sections/filenames used
 
 Answer:"""
+    
+    CONTEXT_CHARS_PER_ITEM = 500  # Text excerpt length per context item
+    NO_CONTEXT_ANSWER = "I couldn't find relevant information in the documents to answer this question."
 
     def __init__(self, retriever: GraphRAGRetriever):
         """
@@ -41,6 +44,8 @@ Answer:"""
         """
         self.logger = logger.bind(name=self.__class__.__name__)
         self.retriever = retriever
+        # The template only uses {context} and {query}, so plain str.format is enough
+        self._prompt_str = self.QUERY_PROMPT
         
         try:
             self.llm = OpenAI(
@@ -49,55 +54,103 @@ Answer:"""
                 temperature=0.1,  # Low temperature for factual responses
             )
         except Exception as e:
-            self.logger.error(f"Failed to initialize LLM: {e}")
+            self.logger.error("Failed to initialize LLM: {}", e)
             raise
     
     def _format_context(self, combined_context: List[Dict]) -> str:
         """Format retrieved context for the prompt."""
-        formatted_parts = []
+        buf = io.StringIO()
+        limit = self.CONTEXT_CHARS_PER_ITEM
+        separator = ""  # Parts are separated by a blank line
         
         for idx, item in enumerate(combined_context, 1):
             source = item.get("source", "unknown")
             text = item.get("text", "")
-            metadata = item.get("metadata", {})
-            filename = metadata.get("filename", item.get("document_filename", "Unknown"))
             
             if text:
-                formatted_parts.append(
-                    f"[Source {idx}] From: {filename}\n"
-                    f"Retrieval method: {source}\n"
-                    f"Content: {text[:500]}...\n"
+                metadata = item.get("metadata", {})
+                filename = metadata.get("filename", item.get("document_filename", "Unknown"))
+                excerpt = text if len(text) <= limit else text[:limit]
+                buf.write(
+                    f"{separator}[Source {idx}] From: {filename}\nRetrieval method: {source}\nContent: {excerpt}...\n"
                 )
             elif item.get("name"):
                 # For entities without text
                 entity_type = item.get("type", "Entity")
-                formatted_parts.append(
-                    f"[Source {idx}] Entity: {entity_type} - {item.get('name')}\n"
-                    f"Retrieval method: {source}\n"
-                )
+                buf.write(f"{separator}[Source {idx}] Entity: {entity_type} - {item['name']}\nRetrieval method: {source}\n")
+            else:
+                continue
+            separator = "\n"
         
-        return "\n".join(formatted_parts)
+        return buf.getvalue()
     
     def _extract_sources(self, combined_context: List[Dict]) -> List[Dict]:
-        """Extract source citations from context."""
-        sources = []
-        seen_filenames = set()
+        """Extract source citations from context (first occurrence of each file, in context order)."""
+        sources: Dict[str, Dict] = {}
         
         for item in combined_context:
-            metadata = item.get("metadata", {})
-            filename = metadata.get("filename", item.get("document_filename", "Unknown"))
+            metadata = item.get("metadata") or {}
+            filename = metadata.get("filename") or item.get("document_filename")
             
-            if filename not in seen_filenames and filename != "Unknown":
-                seen_filenames.add(filename)
-                sources.append({
+            if filename and filename != "Unknown" and filename not in sources:
+                sources[filename] = {
                     "filename": filename,
                     "source_type": item.get("source", "unknown"),
                     "chunk_index": metadata.get("chunk_index"),
-                })
+                }
         
-        return sources
+        return list(sources.values())
     
-    def query(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
+    async def _prepare(self, query: str, top_k: int, max_hops: int) -> Tuple[Dict, List[Dict], Optional[str]]:
+        """
+        Retrieve context and build the LLM prompt.
+        
+        Returns:
+            (retrieval result, combined context, formatted prompt or None when nothing was found)
+        """
+        # Step 1: Retrieve context using GraphRAG
+        retrieval_result = await self.retriever.retrieve(query, top_k=top_k, max_hops=max_hops)
+        combined_context = retrieval_result.get("combined_context", [])
+        if not combined_context:
+            return retrieval_result, combined_context, None
+        
+        # Step 2: Format context for LLM
+        formatted_context = self._format_context(combined_context)
+        return retrieval_result, combined_context, self._prompt_str.format(context=formatted_context, query=query)
+    
+    def _build_result(self, answer: str, retrieval_result: Dict, combined_context: List[Dict]) -> Dict:
+        """Assemble the query result for a generated answer."""
+        if not combined_context:
+            return {
+                "answer": self.NO_CONTEXT_ANSWER,
+                "sources": [],
+                "retrieval_info": retrieval_result,
+            }
+        
+        # Step 4: Extract sources
+        sources = self._extract_sources(combined_context)
+        self.logger.info("Generated answer with {} sources", len(sources))
+        
+        return {
+            "answer": answer,
+            "sources": sources,
+            "retrieval_info": {
+                "vector_results_count": len(retrieval_result.get("vector_results", [])),
+                "graph_context_count": len(retrieval_result.get("graph_context", [])),
+                "total_context_items": len(combined_context),
+            },
+        }
+    
+    @staticmethod
+    def _error_result(error: Exception) -> Dict:
+        return {
+            "answer": f"Error processing query: {str(error)}",
+            "sources": [],
+            "retrieval_info": {},
+            "error": str(error),
+        }
+    
+    async def query(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
         """
         Answer a query using GraphRAG retrieval.
         
@@ -110,52 +163,55 @@ Answer:"""
             Dictionary with 'answer', 'sources', and 'retrieval_info'
         """
         try:
-            self.logger.info(f"Processing query: {query}")
-            
-            # Step 1: Retrieve context using GraphRAG
-            retrieval_result = self.retriever.retrieve(query, top_k=top_k, max_hops=max_hops)
-            combined_context = retrieval_result.get("combined_context", [])
-            
-            if not combined_context:
-                return {
-                    "answer": "I couldn't find relevant information in the documents to answer this question.",
-                    "sources": [],
-                    "retrieval_info": retrieval_result,
-                }
-            
-            # Step 2: Format context for LLM
-            formatted_context = self._format_context(combined_context)
+            self.logger.info("Processing query: {}", query)
+            retrieval_result, combined_context, prompt = await self._prepare(query, top_k, max_hops)
+            if prompt is None:
+                return self._build_result("", retrieval_result, combined_context)
             
             # Step 3: Generate answer using LLM
-            prompt = PromptTemplate(self.QUERY_PROMPT)
-            formatted_prompt = prompt.format(context=formatted_context, query=query)
-            
             self.logger.info("Generating answer with LLM...")
-            response = self.llm.complete(formatted_prompt)
-            answer = str(response).strip()
+            response = await self.llm.acomplete(prompt)
+            return self._build_result(str(response).strip(), retrieval_result, combined_context)
+            
+        except Exception as e:
+            self.logger.error("Error processing query: {}", e)
+            return self._error_result(e)
+    
+    async def query_stream(self, query: str, top_k: int = 5, max_hops: int = 2) -> AsyncIterator[Dict]:
+        """
+        Answer a query, yielding the answer as it is generated.
+        
+        Args:
+            query: User question
+            top_k: Number of initial vector results
+            max_hops: Graph traversal depth
             
-            # Step 4: Extract sources
-            sources = self._extract_sources(combined_context)
+        Yields:
+            {"delta": text} for each generated piece of the answer, then a final
+            {"result": ...} with the same shape as query() returns
+        """
+        try:
+            self.logger.info("Processing streaming query: {}", query)
+            retrieval_result, combined_context, prompt = await self._prepare(query, top_k, max_hops)
+            if prompt is None:
+                result = self._build_result("", retrieval_result, combined_context)
+                yield {"delta": result["answer"]}
+                yield {"result": result}
+                return
             
-            self.logger.info(f"Generated answer with {len(sources)} sources")
+            # Step 3: Stream the answer from the LLM
+            self.logger.info("Streaming answer from LLM...")
+            parts = []
+            async for response in await self.llm.astream_complete(prompt):
+                if response.delta:
+                    parts.append(response.delta)
+                    yield {"delta": response.delta}
             
-            return {
-                "answer": answer,
-                "sources": sources,
-                "retrieval_info": {
-                    "vector_results_count": len(retrieval_result.get("vector_results", [])),
-                    "graph_context_count": len(retrieval_result.get("graph_context", [])),
-                    "total_context_items": len(combined_context),
-                },
-            }
+            yield {"result": self._build_result("".join(parts).strip(), retrieval_result, combined_context)}
             
         except Exception as e:
-            self.logger.error(f"Error processing query: {e}")
-            return {
-                "answer": f"Error processing query: {str(e)}",
-                "sources": [],
-                "retrieval_info": {},
-            }
+            self.logger.error("Error processing query: {}", e)
+            yield {"result": self._error_result(e)}
 
 
 
@@ -1,14 +1,46 @@
 """Vector store for embedding-based retrieval."""
-from typing import List, Dict, Optional
-from llama_index.embeddings.openai import OpenAIEmbedding
+from typing import List, Dict, Optional, Tuple
 from llama_index.core import VectorStoreIndex, Document as LlamaDocument, StorageContext
 from llama_index.core.vector_stores import VectorStoreQuery, VectorStoreQueryResult
+from llama_index.core.schema import TextNode, MetadataMode
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
 from llama_index.vector_stores.chroma import ChromaVectorStore
 import chromadb
 from chromadb.config import Settings
 from loguru import logger
 from config.settings import settings
+from .embedding_cache import create_embedding_model
+from ._numba_kernels import topk_partition, warmup as warmup_kernels
 import os
+import threading
+import numpy as np
+
+CHROMA_PERSIST_DIR = "./chroma_db"
+
+# HNSW parameters for new collections (tuned for 1536-d OpenAI embeddings, cosine space).
+# Existing collections keep the parameters they were created with.
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+    "hnsw:search_ef": 128,
+}
+
+_client: Optional[chromadb.PersistentClient] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> chromadb.PersistentClient:
+    """Return the process-wide Chroma client, opening it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+            _client = chromadb.PersistentClient(
+                path=CHROMA_PERSIST_DIR,
+                settings=Settings(anonymized_telemetry=False, allow_reset=False),
+            )
+        return _client
 
 
 class VectorStore:
@@ -17,36 +49,45 @@ class VectorStore:
     Uses ChromaDB for persistent vector storage.
     """
     
-    def __init__(self, collection_name: str = "research_documents"):
+    EMBED_BATCH_SIZE = 128  # Texts per embedding API request
+    QUANTIZATIONS = ("fp32", "fp16", "int8")
+    SCORE_BLOCK_ROWS = 8192  # Rows upcast per block when scoring an fp16 matrix
+    
+    def __init__(self, collection_name: str = "research_documents", quantization: Optional[str] = None):
         """
         Initialize vector store.
         
         Args:
             collection_name: Name of the Chroma collection
+            quantization: Storage precision of the in-memory search matrix:
+                "fp32", "fp16" (half the memory) or "int8" (a quarter, per-row scaled).
+                Defaults to settings.vector_quantization.
         """
         self.logger = logger.bind(name=self.__class__.__name__)
         self.collection_name = collection_name
+        self.quantization = quantization or settings.vector_quantization
+        if self.quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {self.quantization!r}; expected one of {self.QUANTIZATIONS}")
         
-        # Initialize embedding model
-        self.embedding_model = OpenAIEmbedding(
+        # Initialize embedding model (cached locally when enabled)
+        self.embedding_model = create_embedding_model(
             api_key=settings.openai_api_key,
-            model="text-embedding-3-small"
+            model="text-embedding-3-small",
+            embed_batch_size=self.EMBED_BATCH_SIZE,
         )
         
-        # Initialize ChromaDB
-        persist_dir = "./chroma_db"
-        os.makedirs(persist_dir, exist_ok=True)
-        
-        chroma_client = chromadb.PersistentClient(
-            path=persist_dir,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        # Initialize ChromaDB (client is shared across VectorStore instances)
+        chroma_client = _get_client()
         
         # Get or create collection
         try:
-            chroma_collection = chroma_client.get_or_create_collection(collection_name)
+            chroma_collection = chroma_client.get_or_create_collection(collection_name, metadata=HNSW_METADATA)
         except Exception:
-            chroma_collection = chroma_client.create_collection(collection_name)
+            chroma_collection = chroma_client.create_collection(collection_name, metadata=HNSW_METADATA)
+        
+        self._collection = chroma_collection
+        # Touch the collection once so the index is loaded before the first query
+        count = chroma_collection.count()
         
         # Create vector store
         vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
@@ -59,19 +100,71 @@ class VectorStore:
             embed_model=self.embedding_model,
         )
         
-        self.logger.info(f"Vector store initialized with collection: {collection_name}")
+        # Serializes index writes from concurrent ingestions
+        self._write_lock = threading.Lock()
+        
+        # Dense in-memory copy of the collection for exact search (built lazily, dropped on writes)
+        self._dense_lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None  # (N, D) L2-normalized rows, stored per self.quantization
+        self._row_scales: Optional[np.ndarray] = None  # (N,) dequantization scales for int8
+        self._dense_rows: List[Dict] = []  # text/metadata/node_id per matrix row
+        
+        self.logger.info(f"Vector store initialized with collection: {collection_name} ({count} vectors)")
     
-    def add_documents(self, documents: List[LlamaDocument]):
-        """Add documents to the vector store."""
+    def add_documents(self, documents: List[LlamaDocument]) -> List[List[float]]:
+        """
+        Add documents to the vector store.
+        
+        Returns:
+            The document embeddings, in input order
+        """
         try:
+            if not documents:
+                return []
             self.logger.info(f"Adding {len(documents)} documents to vector store")
-            for doc in documents:
-                self.index.insert(doc)
+            
+            # Chunks are already split; index them as-is, keyed by chunk ID
+            nodes = [
+                TextNode(
+                    id_=doc.metadata.get("chunk_id") or doc.doc_id,
+                    text=doc.text,
+                    metadata=doc.metadata,
+                )
+                for doc in documents
+            ]
+            
+            # Embed in batches (one API request per EMBED_BATCH_SIZE texts) instead of per document
+            embeddings = self.embedding_model.get_text_embedding_batch(
+                [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes],
+                show_progress=False,
+            )
+            for node, embedding in zip(nodes, embeddings):
+                node.embedding = embedding
+            
+            # Nodes carry embeddings, so this is a single Chroma write with no further API calls
+            with self._write_lock:
+                self.index.insert_nodes(nodes)
+                self._invalidate_dense_matrix()
             self.logger.info("Documents added successfully")
+            return embeddings
         except Exception as e:
             self.logger.error(f"Error adding documents: {e}")
             raise
     
+    def delete_documents(self, chunk_ids: List[str]):
+        """
+        Remove chunks from the vector store.
+        
+        Args:
+            chunk_ids: IDs of the chunks to remove
+        """
+        if not chunk_ids:
+            return
+        with self._write_lock:
+            self._collection.delete(ids=chunk_ids)
+            self._invalidate_dense_matrix()
+        self.logger.info("Removed {} documents from vector store", len(chunk_ids))
+    
     def similarity_search(
         self, 
         query: str, 
@@ -107,6 +200,112 @@ class VectorStore:
             self.logger.error(f"Error in similarity search: {e}")
             return []
     
+    def warmup(self):
+        """Pay one-off JIT compilation cost for the search kernels before serving queries."""
+        warmup_kernels()
+    
+    def _invalidate_dense_matrix(self):
+        """Drop the dense matrix so the next fast search rebuilds it."""
+        with self._dense_lock:
+            self._matrix = None
+            self._row_scales = None
+            self._dense_rows = []
+    
+    def _build_dense_matrix(self) -> Optional[Tuple[np.ndarray, Optional[np.ndarray], List[Dict]]]:
+        """
+        Load every stored vector into one contiguous, row-normalized matrix.
+        
+        Returns:
+            Consistent snapshot of (matrix, int8 row scales, rows), or None if the collection is empty
+        """
+        with self._dense_lock:
+            # Writes made outside add_documents (e.g. another client of the same Chroma directory)
+            # don't invalidate the matrix; a count mismatch means rebuild
+            if self._matrix is not None and len(self._dense_rows) == self._collection.count():
+                return self._matrix, self._row_scales, self._dense_rows
+            
+            data = self._collection.get(include=["embeddings", "metadatas", "documents"])
+            if not data["ids"]:
+                return None
+            
+            matrix = np.ascontiguousarray(np.vstack(data["embeddings"]), dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+            
+            rows = []
+            for node_id, metadata, text in zip(data["ids"], data["metadatas"], data["documents"]):
+                node = metadata_dict_to_node(metadata, text=text)
+                rows.append({"text": node.text, "metadata": node.metadata, "node_id": node_id})
+            
+            if self.quantization == "fp16":
+                matrix = matrix.astype(np.float16)
+            elif self.quantization == "int8":
+                matrix, self._row_scales = self._quantize_int8(matrix)
+            
+            self._matrix = matrix
+            self._dense_rows = rows
+            self.logger.info(f"Built dense matrix for {matrix.shape[0]} vectors ({matrix.nbytes / 2**20:.1f} MiB)")
+            return matrix, self._row_scales, rows
+    
+    @staticmethod
+    def _quantize_int8(matrix: np.ndarray):
+        """Symmetric per-row int8 quantization: row ~= quantized_row * scale."""
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    
+    def _score(self, matrix: np.ndarray, row_scales: Optional[np.ndarray], query_vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of a normalized query against every matrix row."""
+        if self.quantization == "int8":
+            query_q, query_scale = self._quantize_int8(query_vector[None, :])
+            dots = np.einsum("ij,j->i", matrix, query_q[0], dtype=np.int32)
+            return dots * (row_scales * query_scale[0])
+        
+        if self.quantization == "fp16":
+            # NumPy has no BLAS kernel for fp16, so upcast bounded blocks and use sgemv
+            scores = np.empty(matrix.shape[0], dtype=np.float32)
+            for start in range(0, matrix.shape[0], self.SCORE_BLOCK_ROWS):
+                block = matrix[start:start + self.SCORE_BLOCK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.float32) @ query_vector
+            return scores
+        
+        return matrix @ query_vector
+    
+    def similarity_search_fast(self, query: str, top_k: int = 5) -> List[Dict]:
+        """
+        Exact cosine similarity search over the in-memory matrix (one GEMV per query).
+        
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            
+        Returns:
+            List of documents with scores and metadata, best first
+        """
+        try:
+            dense = self._build_dense_matrix()
+            if dense is None:
+                return []
+            matrix, row_scales, rows = dense
+            
+            query_vector = np.asarray(self.embedding_model.get_query_embedding(query), dtype=np.float32)
+            query_norm = np.linalg.norm(query_vector)
+            if query_norm:
+                query_vector /= query_norm
+            
+            scores = self._score(matrix, row_scales, query_vector)
+            top, top_scores = topk_partition(scores, top_k)
+            
+            results = [{**rows[i], "score": float(score)} for i, score in zip(top, top_scores)]
+            self.logger.info(f"Retrieved {len(results)} results for query")
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Error in fast similarity search: {e}; falling back to index search")
+            return self.similarity_search(query, top_k=top_k)
+    
     def get_chunk_ids_from_results(self, results: List[Dict]) -> List[str]:
         """Extract chunk IDs from search results."""
         chunk_ids = []
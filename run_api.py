@@ -1,14 +1,8 @@
 """Quick script to run the FastAPI backend."""
-import uvicorn
-from config.settings import settings
+from api.server import run
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=True,
-    )
+    run()
 
 
 
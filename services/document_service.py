@@ -1,7 +1,12 @@
 """Service for document ingestion and processing."""
+import asyncio
+import sqlite3
+import threading
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Dict, Tuple, Optional
 from loguru import logger
+from llama_index.core import Document as LlamaDocument
+from config.settings import settings
 from ingestion.pdf_parser import PDFParser
 from ingestion.chunker import DocumentChunker
 from graph.neo4j_store import Neo4jStore
@@ -14,13 +19,19 @@ class DocumentService:
     Coordinates document ingestion: PDF parsing -> chunking -> graph storage -> vector indexing.
     """
     
-    def __init__(self, neo4j_store: Neo4jStore, vector_store: VectorStore):
+    def __init__(
+        self,
+        neo4j_store: Neo4jStore,
+        vector_store: VectorStore,
+        on_ingested: Optional[Callable[[], None]] = None,
+    ):
         """
         Initialize document service.
         
         Args:
             neo4j_store: Neo4j store instance
             vector_store: Vector store instance
+            on_ingested: Called (in a worker thread) after each document is ingested successfully
         """
         self.logger = logger.bind(name=self.__class__.__name__)
         self.pdf_parser = PDFParser()
@@ -28,8 +39,121 @@ class DocumentService:
         self.neo4j_store = neo4j_store
         self.entity_extractor = EntityExtractor()
         self.vector_store = vector_store
+        self.on_ingested = on_ingested
+        
+        # Ingestion status per document ID, in SQLite so it survives API restarts
+        Path(settings.ingestion_status_path).parent.mkdir(parents=True, exist_ok=True)
+        self._status_conn = sqlite3.connect(settings.ingestion_status_path, check_same_thread=False)
+        self._status_conn.execute("PRAGMA journal_mode=WAL")
+        self._status_conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingestion_status ("
+            "document_id TEXT PRIMARY KEY, filename TEXT NOT NULL, status TEXT NOT NULL, error TEXT)"
+        )
+        self._status_conn.commit()
+        self._status_lock = threading.Lock()
+        
+        # Shared across documents so concurrent ingestions stay within the LLM quota together
+        self._llm_semaphore = asyncio.Semaphore(settings.llm_concurrency)
     
-    def ingest_document(self, pdf_path: Path) -> str:
+    @staticmethod
+    def document_id(pdf_path: Path) -> str:
+        """Derive the document ID for a PDF path."""
+        return f"doc_{pdf_path.stem}"
+    
+    def register_document(self, pdf_path: Path) -> str:
+        """
+        Mark a document as queued for ingestion.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Document ID
+        """
+        doc_id = self.document_id(pdf_path)
+        self._set_status(doc_id, pdf_path, "processing")
+        return doc_id
+    
+    def get_status(self, doc_id: str) -> Optional[Dict]:
+        """Get the ingestion status of a document, or None if it is unknown."""
+        with self._status_lock:
+            row = self._status_conn.execute(
+                "SELECT document_id, filename, status, error FROM ingestion_status WHERE document_id = ?",
+                (doc_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        
+        status = {"document_id": row[0], "filename": row[1], "status": row[2]}
+        if row[3]:
+            status["error"] = row[3]
+        return status
+    
+    def _set_status(self, doc_id: str, pdf_path: Path, status: str, error: Optional[str] = None):
+        """Record the ingestion status of a document."""
+        with self._status_lock:
+            self._status_conn.execute(
+                "INSERT OR REPLACE INTO ingestion_status (document_id, filename, status, error) VALUES (?, ?, ?, ?)",
+                (doc_id, pdf_path.name, status, error),
+            )
+            self._status_conn.commit()
+    
+    async def _partition_chunks(
+        self, chunks: List[LlamaDocument]
+    ) -> Tuple[List[Tuple[LlamaDocument, str]], List[str]]:
+        """
+        Split chunks into new content and content already stored in the graph.
+        
+        Args:
+            chunks: Chunks of the document being ingested
+            
+        Returns:
+            (new chunks paired with their content hash, IDs of existing chunks with identical content)
+        """
+        hashes = [self.chunker.content_hash(chunk.text) for chunk in chunks]
+        existing = await self.neo4j_store.find_chunks_by_hashes(list(set(hashes)))
+        
+        new_chunks = []
+        existing_ids = []
+        seen = set()
+        for chunk, content_hash in zip(chunks, hashes):
+            if content_hash in seen:
+                continue  # Repeated within this document (e.g. page headers)
+            seen.add(content_hash)
+            if content_hash in existing:
+                existing_ids.append(existing[content_hash])
+            else:
+                new_chunks.append((chunk, content_hash))
+        
+        return new_chunks, existing_ids
+    
+    async def _extract_chunks(
+        self, chunks: List[LlamaDocument], embeddings: "asyncio.Future[List[List[float]]]"
+    ) -> List[Tuple[LlamaDocument, List[Dict], List[Dict]]]:
+        """
+        Extract entities and relationships from all chunks concurrently.
+        Concurrency is bounded by settings.llm_concurrency to stay within the LLM quota.
+        
+        Args:
+            chunks: Chunks to extract from
+            embeddings: Resolves to the chunk embeddings (in chunk order), for the extraction cache
+        """
+        use_cache = self.entity_extractor.cache is not None
+        
+        async def _extract(index: int, chunk: LlamaDocument):
+            # Wait for the embedding before taking an LLM slot, so waiting doesn't hold one
+            embedding = (await embeddings)[index] if use_cache else None
+            async with self._llm_semaphore:
+                entities, relationships = await self.entity_extractor.extract_async(
+                    text=chunk.text,
+                    chunk_id=chunk.metadata["chunk_id"],
+                    embedding=embedding,
+                )
+            return chunk, entities, relationships
+        
+        return await asyncio.gather(*[_extract(index, chunk) for index, chunk in enumerate(chunks)])
+    
+    async def ingest_document(self, pdf_path: Path) -> str:
         """
         Ingest a PDF document: parse, chunk, extract entities, store in graph and vector DB.
         
@@ -39,76 +163,134 @@ class DocumentService:
         Returns:
             Document ID
         """
+        doc_id = self.document_id(pdf_path)
+        self._set_status(doc_id, pdf_path, "processing")
         try:
             self.logger.info(f"Starting ingestion of {pdf_path}")
             
-            # Step 1: Parse PDF
-            parsed = self.pdf_parser.parse(pdf_path)
-            doc_id = f"doc_{pdf_path.stem}"
+            # Step 1: Parse PDF (blocking work runs in a thread to keep the event loop free)
+            parsed = await asyncio.to_thread(self.pdf_parser.parse, pdf_path)
             
-            # Step 2: Create document node in Neo4j
-            self.neo4j_store.create_document_node(
-                doc_id=doc_id,
-                filename=parsed["metadata"]["filename"],
+            # Step 2: Chunk document
+            chunks = await asyncio.to_thread(
+                self.chunker.chunk_document,
+                text=parsed["text"],
                 metadata=parsed["metadata"],
             )
             
-            # Step 3: Chunk document
-            chunks = self.chunker.chunk_document(
-                text=parsed["text"],
-                metadata=parsed["metadata"],
+            # Step 3: Skip chunks whose content is already stored (identical across documents
+            # or re-ingests); they are only linked to this document
+            new_chunks, existing_ids = await self._partition_chunks(chunks)
+            self.logger.info(
+                f"{len(new_chunks)} new chunks, {len(existing_ids)} already stored, "
+                f"{len(chunks) - len(new_chunks) - len(existing_ids)} repeated within the document"
             )
+            chunks = [chunk for chunk, _ in new_chunks]
+            current_ids = [chunk.metadata["chunk_id"] for chunk in chunks] + existing_ids
             
-            # Step 4: Process each chunk
-            all_relationships = []
+            # Step 4: Embed and index the new chunks while extracting their entities and
+            # relationships; the extraction cache reuses these embeddings instead of embedding again
+            index_task = asyncio.ensure_future(asyncio.to_thread(self.vector_store.add_documents, chunks))
+            extracted, embeddings = await asyncio.gather(
+                self._extract_chunks(chunks, index_task),
+                index_task,
+            )
             
-            for chunk in chunks:
+            # Step 5: Write the whole document to Neo4j in a single transaction: one query
+            # each for the document, chunks, chunk links, entities (per type) and relationships (per type)
+            chunk_rows = [
+                {
+                    "id": chunk.metadata["chunk_id"],
+                    "text": chunk.text,
+                    "metadata": chunk.metadata,
+                    "content_hash": content_hash,
+                }
+                for chunk, content_hash in new_chunks
+            ]
+            if settings.use_neo4j_vector:
+                # Store embeddings on the chunk nodes for the Neo4j vector index
+                for row, embedding in zip(chunk_rows, embeddings):
+                    row["embedding"] = embedding
+            entity_rows = []
+            relationship_rows = []
+            for chunk, entities, relationships in extracted:
                 chunk_id = chunk.metadata["chunk_id"]
-                chunk_text = chunk.text
-                
-                # Create chunk node in Neo4j
-                self.neo4j_store.create_chunk_node(
-                    chunk_id=chunk_id,
-                    text=chunk_text,
-                    metadata=chunk.metadata,
+                entity_rows.extend({**entity, "chunk_id": chunk_id} for entity in entities)
+                relationship_rows.extend(relationships)
+            
+            async def _write_graph(tx):
+                await self.neo4j_store.create_document_node(
                     doc_id=doc_id,
+                    filename=parsed["metadata"]["filename"],
+                    metadata=parsed["metadata"],
+                    tx=tx,
                 )
-                
-                # Extract entities and relationships
-                entities, relationships = self.entity_extractor.extract(
-                    text=chunk_text,
-                    chunk_id=chunk_id,
-                )
-                
-                # Create entity nodes for this chunk
-                if entities:
-                    self.neo4j_store.create_entity_nodes(entities, chunk_id)
-                
-                all_relationships.extend(relationships)
+                if chunk_rows:
+                    await self.neo4j_store.create_chunk_nodes_bulk(chunk_rows, doc_id=doc_id, tx=tx)
+                if existing_ids:
+                    await self.neo4j_store.link_chunks_to_document(existing_ids, doc_id=doc_id, tx=tx)
+                # Chunks of an earlier version of this document that are no longer in it
+                stale_ids = await self.neo4j_store.remove_stale_chunks(doc_id, keep_ids=current_ids, tx=tx)
+                if entity_rows:
+                    await self.neo4j_store.create_entity_nodes_bulk(entity_rows, tx=tx)
+                # Relationships last, after all entities exist
+                if relationship_rows:
+                    await self.neo4j_store.create_relationships(relationship_rows, tx=tx)
+                return stale_ids
+            
+            stale_ids = await self.neo4j_store.execute_write(_write_graph)
+            if stale_ids:
+                await asyncio.to_thread(self.vector_store.delete_documents, stale_ids)
             
-            # Step 5: Create relationships (after all entities exist)
-            if all_relationships:
-                self.neo4j_store.create_relationships(all_relationships)
+            await asyncio.to_thread(self.entity_extractor.save_cache)
             
-            # Step 7: Add chunks to vector store
-            self.vector_store.add_documents(chunks)
+            # The corpus changed, so answers computed before this document may be stale
+            if self.on_ingested is not None:
+                await asyncio.to_thread(self.on_ingested)
             
+            self._set_status(doc_id, pdf_path, "completed")
             self.logger.info(f"Successfully ingested document {doc_id}")
             return doc_id
             
         except Exception as e:
+            self._set_status(doc_id, pdf_path, "failed", error=str(e))
             self.logger.error(f"Error ingesting document {pdf_path}: {e}")
             raise
     
-    def ingest_multiple_documents(self, pdf_paths: List[Path]) -> List[str]:
-        """Ingest multiple PDF documents."""
-        doc_ids = []
-        for pdf_path in pdf_paths:
-            try:
-                doc_id = self.ingest_document(pdf_path)
-                doc_ids.append(doc_id)
-            except Exception as e:
-                self.logger.error(f"Failed to ingest {pdf_path}: {e}")
-                continue
-        return doc_ids
+    async def ingest_document_background(self, pdf_path: Path):
+        """
+        Ingest a document as a background task. Failures are recorded in the
+        status table (see get_status) instead of being raised.
+        """
+        try:
+            await self.ingest_document(pdf_path)
+        except Exception:
+            pass  # Already logged and recorded by ingest_document
+    
+    async def ingest_multiple_documents(self, pdf_paths: List[Path]) -> List[str]:
+        """
+        Ingest multiple PDF documents concurrently.
+        
+        Args:
+            pdf_paths: Paths to PDF files
+            
+        Returns:
+            Document IDs of the successfully ingested documents, in input order
+        """
+        if not pdf_paths:
+            return []
+        
+        # Each document is dominated by network calls, so overlap them across documents
+        semaphore = asyncio.Semaphore(min(len(pdf_paths), settings.document_concurrency))
+        
+        async def _ingest(pdf_path: Path) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.ingest_document(pdf_path)
+                except Exception as e:
+                    self.logger.error(f"Failed to ingest {pdf_path}: {e}")
+                    return None
+        
+        results = await asyncio.gather(*[_ingest(pdf_path) for pdf_path in pdf_paths])
+        return [doc_id for doc_id in results if doc_id]
 
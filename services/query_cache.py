@@ -0,0 +1,166 @@
+"""Semantic cache for query answers."""
+from pathlib import Path
+from typing import Dict, List, Optional
+import sqlite3
+import threading
+import time
+import numpy as np
+import orjson
+from loguru import logger
+
+
+class SemanticQueryCache:
+    """
+    Caches query results keyed by query embedding.
+    
+    A new query reuses the answer of a previous query whose embedding has
+    cosine similarity >= threshold, as long as it was asked with the same
+    top_k/max_hops and is younger than ttl_seconds. Entries are persisted to
+    SQLite and reloaded on startup; answers for newly ingested documents
+    become visible once stale entries expire.
+    """
+    
+    def __init__(self, path: str, threshold: float = 0.95, ttl_seconds: int = 3600):
+        """
+        Initialize query cache.
+        
+        Args:
+            path: Path to the SQLite cache file
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Maximum age of a reusable entry
+        """
+        self.logger = logger.bind(name=self.__class__.__name__)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        
+        # Row-normalized embeddings (capacity-doubling buffer) with parallel per-row arrays
+        self._matrix: Optional[np.ndarray] = None
+        self._created = np.empty(0, dtype=np.float64)
+        self._params = np.empty((0, 2), dtype=np.int64)  # (top_k, max_hops)
+        self._payloads: List[bytes] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache ("
+            "created_at REAL NOT NULL, top_k INTEGER NOT NULL, max_hops INTEGER NOT NULL, "
+            "embedding BLOB NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        
+        self._load()
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _load(self):
+        """Drop expired entries and load the rest into memory."""
+        try:
+            cutoff = time.time() - self.ttl_seconds
+            self._conn.execute("DELETE FROM query_cache WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT created_at, top_k, max_hops, embedding, payload FROM query_cache"
+            ).fetchall()
+            for created_at, top_k, max_hops, embedding, payload in rows:
+                self._append(np.frombuffer(embedding, dtype=np.float32), created_at, top_k, max_hops, payload)
+            if rows:
+                self.logger.info(f"Loaded {len(rows)} cached query results")
+        except Exception as e:
+            self.logger.warning(f"Could not load query cache: {e}")
+    
+    def _append(self, vector: np.ndarray, created_at: float, top_k: int, max_hops: int, payload: bytes):
+        if self._matrix is None:
+            self._matrix = np.empty((64, vector.shape[0]), dtype=np.float32)
+            self._created = np.empty(64, dtype=np.float64)
+            self._params = np.empty((64, 2), dtype=np.int64)
+        elif self._size == len(self._matrix):
+            capacity = 2 * len(self._matrix)
+            self._matrix = np.resize(self._matrix, (capacity, self._matrix.shape[1]))
+            self._created = np.resize(self._created, capacity)
+            self._params = np.resize(self._params, (capacity, 2))
+        
+        self._matrix[self._size] = vector
+        self._created[self._size] = created_at
+        self._params[self._size] = (top_k, max_hops)
+        self._payloads.append(payload)
+        self._size += 1
+    
+    def lookup(self, embedding: List[float], top_k: int, max_hops: int) -> Optional[Dict]:
+        """
+        Find a cached result for a semantically equivalent query.
+        
+        Args:
+            embedding: Embedding of the query text
+            top_k: Number of vector results the query asks for
+            max_hops: Graph traversal depth the query asks for
+        
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        with self._lock:
+            if not self._size:
+                return None
+            
+            size = self._size
+            scores = self._matrix[:size] @ self._normalize(embedding)
+            # Only entries with matching parameters that have not expired are eligible
+            eligible = (
+                (self._params[:size, 0] == top_k)
+                & (self._params[:size, 1] == max_hops)
+                & (self._created[:size] >= time.time() - self.ttl_seconds)
+            )
+            scores = np.where(eligible, scores, -np.inf)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            
+            self.logger.debug("Query cache hit (similarity {:.3f})", scores[best])
+            return orjson.loads(self._payloads[best])
+    
+    def add(self, embedding: List[float], top_k: int, max_hops: int, result: Dict):
+        """
+        Store the result of a query.
+        
+        Args:
+            embedding: Embedding of the query text
+            top_k: Number of vector results used
+            max_hops: Graph traversal depth used
+            result: Query result to cache
+        """
+        try:
+            payload = orjson.dumps(result)
+            vector = self._normalize(embedding)
+            created_at = time.time()
+            with self._lock:
+                self._append(vector, created_at, top_k, max_hops, payload)
+                self._conn.execute(
+                    "INSERT INTO query_cache (created_at, top_k, max_hops, embedding, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (created_at, top_k, max_hops, sqlite3.Binary(vector.tobytes()), payload),
+                )
+                self._conn.commit()
+        except Exception as e:
+            self.logger.warning(f"Could not cache query result: {e}")
+    
+    def clear(self):
+        """Remove all cached results."""
+        with self._lock:
+            self._matrix = None
+            self._payloads = []
+            self._size = 0
+            self._conn.execute("DELETE FROM query_cache")
+            self._conn.commit()
+
+
+
+
+
+
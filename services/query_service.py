@@ -1,8 +1,10 @@
 """Service for processing queries."""
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional
 from loguru import logger
+from config.settings import settings
 from retrieval.graphrag_retriever import GraphRAGRetriever
 from retrieval.query_engine import QueryEngine
+from .query_cache import SemanticQueryCache
 
 
 class QueryService:
@@ -18,8 +20,27 @@ class QueryService:
         """
         self.logger = logger.bind(name=self.__class__.__name__)
         self.query_engine = query_engine
+        self.embedding_model = retriever.vector_store.embedding_model
+        
+        # Semantic cache: near-duplicate queries reuse a previous answer
+        self.cache: Optional[SemanticQueryCache] = None
+        if settings.query_cache_enabled:
+            try:
+                self.cache = SemanticQueryCache(
+                    path=settings.query_cache_path,
+                    threshold=settings.query_cache_threshold,
+                    ttl_seconds=settings.query_cache_ttl_seconds,
+                )
+            except Exception as e:
+                self.logger.warning(f"Query cache unavailable: {e}")
+    
+    def invalidate_cache(self):
+        """Forget all cached answers, e.g. after new documents are ingested."""
+        if self.cache is not None:
+            self.cache.clear()
+            self.logger.info("Cleared query cache")
     
-    def process_query(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
+    async def process_query(self, query: str, top_k: int = 5, max_hops: int = 2) -> Dict:
         """
         Process a user query and return answer.
         
@@ -31,7 +52,51 @@ class QueryService:
         Returns:
             Query result with answer and sources
         """
-        return self.query_engine.query(query, top_k=top_k, max_hops=max_hops)
+        if self.cache is None:
+            return await self.query_engine.query(query, top_k=top_k, max_hops=max_hops)
+        
+        # The embedding is cached locally, so vector search reuses it without another API call
+        embedding = await self.embedding_model.aget_query_embedding(query)
+        cached = self.cache.lookup(embedding, top_k=top_k, max_hops=max_hops)
+        if cached is not None:
+            self.logger.info(f"Serving cached answer for query: {query[:100]}...")
+            return cached
+        
+        result = await self.query_engine.query(query, top_k=top_k, max_hops=max_hops)
+        if result.get("sources"):  # Don't cache "no relevant information" or error answers
+            self.cache.add(embedding, top_k=top_k, max_hops=max_hops, result=result)
+        return result
+    
+    async def process_query_stream(self, query: str, top_k: int = 5, max_hops: int = 2) -> AsyncIterator[Dict]:
+        """
+        Process a user query, streaming the answer as it is generated.
+        
+        Args:
+            query: User question
+            top_k: Number of vector results
+            max_hops: Graph traversal depth
+            
+        Yields:
+            {"delta": text} events, then a final {"result": ...} (see QueryEngine.query_stream)
+        """
+        if self.cache is None:
+            async for event in self.query_engine.query_stream(query, top_k=top_k, max_hops=max_hops):
+                yield event
+            return
+        
+        embedding = await self.embedding_model.aget_query_embedding(query)
+        cached = self.cache.lookup(embedding, top_k=top_k, max_hops=max_hops)
+        if cached is not None:
+            self.logger.info(f"Serving cached answer for query: {query[:100]}...")
+            yield {"delta": cached["answer"]}
+            yield {"result": cached}
+            return
+        
+        async for event in self.query_engine.query_stream(query, top_k=top_k, max_hops=max_hops):
+            result = event.get("result")
+            if result is not None and result.get("sources"):
+                self.cache.add(embedding, top_k=top_k, max_hops=max_hops, result=result)
+            yield event
 
 
 
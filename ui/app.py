@@ -1,9 +1,43 @@
 """Streamlit UI for Context-Aware Research Assistant."""
 import streamlit as st
-import requests
 from pathlib import Path
+from collections import deque
+from functools import lru_cache
+import threading
 import time
 
+# HTTP, multipart, hashing and JSON modules are imported inside the functions that use
+# them, so a cold `streamlit run` reaches first paint without loading them
+
+# Static page content
+TITLE = "📚 Context-Aware Research Assistant"
+SUBTITLE = "Upload PDF documents and ask questions using GraphRAG retrieval"
+FOOTER_HTML = (
+    "<style>.app-footer{text-align:center;color:gray}</style>"
+    "<div class='app-footer'>"
+    "Context-Aware Research Assistant | Powered by LlamaIndex, Neo4j, and GraphRAG"
+    "</div>"
+)
+
+# Seconds between API health checks (also the health cache TTL)
+HEALTH_REFRESH_SECONDS = 15
+
+# Parallel per-file uploads
+MAX_UPLOAD_WORKERS = 4
+PROGRESS_INTERVAL_SECONDS = 0.25
+UPLOAD_CHUNK_SIZE = 1 << 16  # 64 KiB reads from the multipart encoder
+
+# Seconds between ingestion status polls for accepted uploads
+INGESTION_POLL_SECONDS = 5
+
+# Bounds on per-session state (only the latest history entries are shown)
+QUERY_HISTORY_SIZE = 5
+MAX_TRACKED_UPLOADS = 200
+
+# Memoized answers, shared by all sessions
+QUERY_CACHE_SIZE = 64
+QUERY_CACHE_TTL_SECONDS = 300
+
 # Page configuration
 st.set_page_config(
     page_title="Context-Aware Research Assistant",
@@ -20,88 +54,361 @@ API_BASE_URL = st.sidebar.text_input(
 
 # Initialize session state
 if "uploaded_files" not in st.session_state:
-    st.session_state.uploaded_files = []
+    st.session_state.uploaded_files = {}  # content digest -> filename, in ingestion order
+if "pending_ingests" not in st.session_state:
+    st.session_state.pending_ingests = {}  # document ID -> (content digest, filename)
 if "query_history" not in st.session_state:
-    st.session_state.query_history = []
+    st.session_state.query_history = deque(maxlen=QUERY_HISTORY_SIZE)
 
 
-def check_api_health():
-    """Check if API is available."""
+@lru_cache(maxsize=None)
+def _json_loads():
+    """Return the JSON parser to use, resolved on first call."""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/health", timeout=5)
-        return response.status_code == 200, response.json()
+        from orjson import loads
+    except ImportError:  # Optional speedup: fall back to stdlib json
+        from json import loads
+    return loads
+
+
+def _loads(data):
+    """Parse JSON from bytes or str."""
+    return _json_loads()(data)
+
+
+@lru_cache(maxsize=8)
+def endpoints(base_url):
+    """Return the API endpoint URLs for a base URL."""
+    base_url = base_url.rstrip("/")
+    return {
+        "health": f"{base_url}/api/health",
+        "upload": f"{base_url}/api/upload",
+        "query_stream": f"{base_url}/api/query/stream",
+        "status": f"{base_url}/api/status",
+    }
+
+
+@st.cache_resource
+def get_http_client():
+    """Return an HTTP client shared across reruns, so connections are kept alive."""
+    import httpx
+    
+    transport = httpx.HTTPTransport(
+        http2=True,  # Negotiated over TLS; multiplexes concurrent requests on one connection
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+        retries=2,  # Retries failed connection attempts only
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(120.0, connect=5.0),
+        headers={"Accept-Encoding": "gzip"},  # The API gzips larger responses
+    )
+
+
+@st.cache_data(ttl=HEALTH_REFRESH_SECONDS, show_spinner=False)
+def check_api_health(base_url):
+    """Check if API is available. Cached so reruns don't each wait on a health request."""
+    try:
+        response = get_http_client().get(endpoints(base_url)["health"], timeout=5)
+        return {"ok": response.status_code == 200, "info": _loads(response.content)}
     except Exception as e:
-        return False, {"error": str(e)}
+        return {"ok": False, "info": {"error": str(e)}}
 
 
-def upload_documents(files):
-    """Upload documents to the API."""
+def get_ingestion_status(base_url, doc_id):
+    """
+    Fetch the ingestion status of an uploaded document.
+    
+    Returns:
+        Status record from the API, or None if the API could not be reached
+    """
+    from urllib.parse import quote
+    
     try:
-        file_data = []
-        for file in files:
-            file_data.append(("files", (file.name, file.getvalue(), "application/pdf")))
-        
-        response = requests.post(
-            f"{API_BASE_URL}/api/upload",
-            files=file_data,
+        response = get_http_client().get(
+            f"{endpoints(base_url)['status']}/{quote(doc_id, safe='')}", timeout=5
+        )
+    except Exception:
+        return None
+    if response.status_code == 404:  # The API no longer knows the document; treat as failed
+        return {"status": "failed", "error": "Unknown document"}
+    if response.status_code != 200:
+        return None
+    return _loads(response.content)
+
+
+def _upload_one(client, url, monitor):
+    """Upload a single PDF to the API."""
+    try:
+        response = client.post(
+            url,
+            content=iter(lambda: monitor.read(UPLOAD_CHUNK_SIZE), b""),
+            headers={"Content-Type": monitor.content_type, "Content-Length": str(monitor.len)},
             timeout=300,  # 5 minutes for large files
         )
-        
-        if response.status_code == 200:
-            return True, response.json()
-        else:
-            return False, response.json()
+        return response.status_code == 200, _loads(response.content)
     except Exception as e:
         return False, {"error": str(e)}
 
 
-def query_documents(query, top_k=5, max_hops=2):
-    """Send query to the API."""
+def _byte_counter(sent, index):
+    """Return a monitor callback recording the bytes sent for one file."""
+    def callback(monitor):
+        sent[index] = monitor.bytes_read
+    return callback
+
+
+def upload_documents(base_url, files, on_progress=None):
+    """
+    Upload documents to the API, one request per file, several at a time.
+    
+    Args:
+        base_url: API base URL
+        files: Uploaded PDF files
+        on_progress: Called from the calling thread with the fraction of bytes sent so far
+    
+    Returns:
+        (success, summary) with the accepted document IDs, the ID of each accepted
+        file, and any per-file errors
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait
+    from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
+    
+    # Stream each multipart body from its file object instead of copying it into memory
+    sent = [0] * len(files)
+    monitors = []
+    for index, file in enumerate(files):
+        file.seek(0)
+        encoder = MultipartEncoder(fields=[("files", (file.name, file, "application/pdf"))])
+        monitors.append(MultipartEncoderMonitor(encoder, _byte_counter(sent, index)))
+    total = sum(monitor.len for monitor in monitors) or 1
+    
+    client = get_http_client()
+    with ThreadPoolExecutor(max_workers=min(MAX_UPLOAD_WORKERS, len(files))) as executor:
+        url = endpoints(base_url)["upload"]
+        futures = [executor.submit(_upload_one, client, url, monitor) for monitor in monitors]
+        # Worker threads only count bytes; progress is reported from this (script) thread
+        while on_progress is not None:
+            _, not_done = wait(futures, timeout=PROGRESS_INTERVAL_SECONDS)
+            on_progress(min(sum(sent) / total, 1.0))
+            if not not_done:
+                break
+        results = [future.result() for future in futures]
+    
+    document_ids = []
+    documents = {}  # filename -> document ID
+    errors = {}
+    for file, (success, result) in zip(files, results):
+        if success:
+            ids = result.get("document_ids", [])
+            document_ids.extend(ids)
+            if ids:
+                documents[file.name] = ids[0]
+        else:
+            errors[file.name] = result
+    
+    summary = {
+        "document_ids": document_ids,
+        "documents": documents,
+        "status": "processing",
+        "message": f"Accepted {len(document_ids)} of {len(files)} document(s) for ingestion",
+    }
+    if errors:
+        summary["errors"] = errors
+    return not errors, summary
+
+
+def stream_query(base_url, query, top_k=5, max_hops=2):
+    """
+    Send query to the API and stream the answer as it is generated.
+    
+    Yields:
+        {"delta": text} for each piece of the answer, then {"result": ...} with the
+        full answer, sources and retrieval info, or {"error": ...} if the query failed
+    """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/query",
+        with get_http_client().stream(
+            "POST",
+            endpoints(base_url)["query_stream"],
             json={"query": query, "top_k": top_k, "max_hops": max_hops},
-            timeout=120,
-        )
-        
-        if response.status_code == 200:
-            return True, response.json()
-        else:
-            return False, response.json()
+            headers={"Accept-Encoding": "identity"},  # Compression would hold back streamed events
+        ) as response:
+            if response.status_code != 200:
+                yield {"error": _loads(response.read())}
+                return
+            
+            # Server-Sent Events: "event:" names the next "data:" line; a blank line ends an event
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = _loads(line[len("data:"):])
+                    if event == "result":
+                        yield {"result": data}
+                        return
+                    if event == "error":
+                        yield {"error": data}
+                        return
+                    yield data
+                elif not line:
+                    event = None
+        yield {"error": "Stream ended before the answer was complete"}
     except Exception as e:
-        return False, {"error": str(e)}
+        yield {"error": str(e)}
+
+
+class QueryError(Exception):
+    """Raised when the API fails to answer a query."""
+    
+    def __init__(self, payload):
+        super().__init__(payload)
+        self.payload = payload if isinstance(payload, dict) else {"error": payload}
+
+
+@st.cache_resource
+def get_query_cache():
+    """Return the answer cache shared across sessions, with the lock guarding it."""
+    from cachetools import TTLCache
+    
+    return TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL_SECONDS), threading.Lock()
+
+
+def clear_query_cache():
+    """Forget all memoized answers."""
+    cache, lock = get_query_cache()
+    with lock:
+        cache.clear()
+
+
+def query_documents(base_url, query, top_k, max_hops, on_delta=None):
+    """
+    Answer a query, memoized on (base_url, query, top_k, max_hops).
+    
+    Repeating a query within the TTL returns the cached result without contacting
+    the API. Failures raise QueryError and, like answers without sources, are never cached.
+    
+    Args:
+        base_url: API base URL
+        query: Question to answer
+        top_k: Number of vector results
+        max_hops: Graph traversal depth
+        on_delta: Called with each streamed piece of the answer (not called on a cache hit)
+    
+    Returns:
+        Query result with answer, sources, and retrieval information
+    """
+    key = (base_url, query, top_k, max_hops)
+    cache, lock = get_query_cache()
+    with lock:
+        result = cache.get(key)
+    if result is not None:
+        return result
+    
+    for event in stream_query(base_url, query, top_k=top_k, max_hops=max_hops):
+        if "delta" in event:
+            if on_delta is not None:
+                on_delta(event["delta"])
+        elif "result" in event:
+            result = event["result"]
+            # Same rule as the API's own cache: only keep answers grounded in sources
+            if result.get("sources"):
+                with lock:
+                    cache[key] = result
+            return result
+        else:
+            raise QueryError(event["error"])
+    raise QueryError("Stream ended before the answer was complete")
+
+
+def file_digest(file):
+    """SHA-256 of an uploaded file's contents, hashed in place without copying."""
+    import hashlib
+    
+    return hashlib.sha256(file.getbuffer()).hexdigest()
+
+
+def is_pdf(file):
+    """Check an uploaded file for the PDF header."""
+    return bytes(file.getbuffer()[:5]) == b"%PDF-"
+
+
+def remember_uploads(digests):
+    """
+    Record successfully ingested files in session state, keeping only the most recent ones.
+    
+    Args:
+        digests: Mapping of content digest to filename
+    """
+    uploaded = st.session_state.uploaded_files
+    for digest, name in digests.items():
+        uploaded.pop(digest, None)
+        uploaded[digest] = name
+    while len(uploaded) > MAX_TRACKED_UPLOADS:
+        del uploaded[next(iter(uploaded))]
+
+
+@st.fragment(run_every=HEALTH_REFRESH_SECONDS)
+def render_health_status(base_url):
+    """Render the API status badges; refreshes on its own without rerunning the page."""
+    health = check_api_health(base_url)
+    health_info = health["info"]
+    if health["ok"]:
+        st.success("✅ API Connected")
+        if health_info.get("neo4j") == "connected":
+            st.success("✅ Neo4j Connected")
+        else:
+            st.warning(f"⚠️ Neo4j: {health_info.get('neo4j')}")
+    else:
+        st.error("❌ API Not Available")
+        st.error(f"Error: {health_info.get('error', 'Unknown')}")
+
+
+@st.fragment(run_every=INGESTION_POLL_SECONDS)
+def render_ingestion_status(base_url):
+    """Poll the API for accepted uploads still being ingested and report how each one ends."""
+    pending = st.session_state.pending_ingests
+    for doc_id, (digest, name) in list(pending.items()):
+        status = get_ingestion_status(base_url, doc_id)
+        if status is None or status.get("status") == "processing":
+            continue
+        del pending[doc_id]
+        if status.get("status") == "completed":
+            # Only now is the file a duplicate; a failed one may be uploaded again
+            remember_uploads({digest: name})
+            st.toast(f"✅ Ingested {name}")
+        else:
+            st.toast(f"❌ Ingestion failed for {name}: {status.get('error', 'Unknown error')}")
+    if pending:
+        names = ", ".join(name for _, name in pending.values())
+        st.caption(f"⏳ Processing {len(pending)} document(s): {names}")
 
 
 # Main UI
-st.title("📚 Context-Aware Research Assistant")
-st.markdown("Upload PDF documents and ask questions using GraphRAG retrieval")
+st.title(TITLE)
+st.markdown(SUBTITLE)
 
 # Sidebar
 st.sidebar.header("Configuration")
 
 # Health check
 st.sidebar.subheader("API Status")
-health_ok, health_info = check_api_health()
-if health_ok:
-    st.sidebar.success("✅ API Connected")
-    if health_info.get("neo4j") == "connected":
-        st.sidebar.success("✅ Neo4j Connected")
-    else:
-        st.sidebar.warning(f"⚠️ Neo4j: {health_info.get('neo4j')}")
-else:
-    st.sidebar.error("❌ API Not Available")
-    st.sidebar.error(f"Error: {health_info.get('error', 'Unknown')}")
+with st.sidebar:
+    render_health_status(API_BASE_URL)
 
-# Query settings
-st.sidebar.subheader("Query Settings")
-top_k = st.sidebar.slider("Top K (vector results)", 3, 10, 5)
-max_hops = st.sidebar.slider("Max Graph Hops", 1, 3, 2)
+# Query cache
+st.sidebar.subheader("Query Cache")
+if st.sidebar.button("Clear query cache", help="Forget memoized answers and ask the API again"):
+    clear_query_cache()
 
 # Main content area
 tab1, tab2 = st.tabs(["📤 Upload Documents", "❓ Query Documents"])
 
-# Tab 1: Document Upload
-with tab1:
+
+# Each tab is a fragment: interacting with its widgets reruns only that tab, not the whole page
+@st.fragment
+def render_upload_tab(base_url):
+    """Render the document upload tab."""
     st.header("Upload PDF Documents")
     st.markdown("Upload one or more PDF documents to build the knowledge graph")
     
@@ -115,108 +422,180 @@ with tab1:
         st.info(f"{len(uploaded_files)} file(s) selected")
         
         if st.button("Upload and Process", type="primary"):
-            with st.spinner("Uploading and processing documents... This may take a while."):
-                success, result = upload_documents(uploaded_files)
+            # Validate and dedupe locally: files ingested or still ingesting are not sent again
+            invalid = []
+            in_flight = {digest for digest, _ in st.session_state.pending_ingests.values()}
+            pending = {}  # content digest -> file
+            for file in uploaded_files:
+                if not is_pdf(file):
+                    invalid.append(file.name)
+                    continue
+                digest = file_digest(file)
+                if digest not in st.session_state.uploaded_files and digest not in in_flight:
+                    pending.setdefault(digest, file)
+            
+            if invalid:
+                st.warning(f"⚠️ Skipping files that are not valid PDFs: {', '.join(invalid)}")
+            skipped = len(uploaded_files) - len(invalid) - len(pending)
+            if skipped:
+                st.info(f"Skipping {skipped} file(s) already ingested or processing in this session")
+            
+            if pending:
+                progress_bar = st.progress(0.0, text="Uploading documents...")
+                success, result = upload_documents(
+                    base_url,
+                    list(pending.values()),
+                    on_progress=lambda fraction: progress_bar.progress(
+                        fraction, text=f"Uploading documents... {fraction:.0%}"
+                    ),
+                )
+                progress_bar.empty()
+                
+                # Track accepted files until the API reports how their ingestion ends
+                accepted = result["documents"]
+                for digest, file in pending.items():
+                    if file.name in accepted:
+                        st.session_state.pending_ingests[accepted[file.name]] = (digest, file.name)
                 
                 if success:
-                    st.success(f"✅ Successfully uploaded {len(uploaded_files)} document(s)")
+                    st.success(f"✅ Successfully uploaded {len(pending)} document(s)")
                     st.json(result)
-                    st.session_state.uploaded_files.extend([f.name for f in uploaded_files])
                 else:
                     st.error("❌ Upload failed")
                     st.json(result)
 
-# Tab 2: Query
-with tab2:
+
+@st.fragment
+def render_query_tab(base_url):
+    """Render the query tab."""
     st.header("Query Documents")
     st.markdown("Ask questions about your uploaded documents")
     
-    # Query input
-    user_query = st.text_area(
-        "Enter your question",
-        height=100,
-        placeholder="Example: How does maternity leave policy affect project deadlines?",
-    )
-    
-    col1, col2 = st.columns([1, 5])
-    with col1:
-        submit_button = st.button("Submit Query", type="primary")
+    # Query input and settings are a form: editing them does not rerun until submitted
+    with st.form("query_form", clear_on_submit=False):
+        user_query = st.text_area(
+            "Enter your question",
+            height=100,
+            placeholder="Example: How does maternity leave policy affect project deadlines?",
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            top_k = st.slider("Top K (vector results)", 3, 10, 5)
+        with col2:
+            max_hops = st.slider("Max Graph Hops", 1, 3, 2)
+        
+        submit_button = st.form_submit_button("Submit Query", type="primary")
     
     # Process query
     if submit_button and user_query:
-        if not health_ok:
+        if not check_api_health(base_url)["ok"]:
             st.error("⚠️ API is not available. Please check the API URL and ensure the backend is running.")
         else:
-            with st.spinner("Processing query... This may take 30-60 seconds."):
-                success, result = query_documents(user_query, top_k=top_k, max_hops=max_hops)
+            answer_placeholder = st.empty()
+            answer_parts = []
+            
+            def render_delta(delta):
+                # Render the answer as it arrives instead of waiting for the whole response
+                answer_parts.append(delta)
+                answer_placeholder.markdown("### Answer\n\n" + "".join(answer_parts))
+            
+            result = None
+            try:
+                with st.spinner("Processing query... This may take 30-60 seconds."):
+                    result = query_documents(base_url, user_query, top_k, max_hops, on_delta=render_delta)
+            except QueryError as e:
+                error = e.payload
+            
+            if result is not None:
+                # Display answer
+                answer_placeholder.markdown(f"### Answer\n\n{result.get('answer') or 'No answer generated'}")
                 
-                if success:
-                    # Display answer
-                    st.subheader("Answer")
-                    st.markdown(result.get("answer", "No answer generated"))
-                    
-                    # Display sources
-                    sources = result.get("sources", [])
-                    if sources:
-                        st.subheader("Sources")
-                        for idx, source in enumerate(sources, 1):
-                            with st.expander(f"Source {idx}: {source.get('filename', 'Unknown')}"):
-                                st.write(f"**Document:** {source.get('filename')}")
-                                st.write(f"**Retrieval Method:** {source.get('source_type', 'unknown')}")
-                                if source.get('chunk_index') is not None:
-                                    st.write(f"**Chunk Index:** {source.get('chunk_index')}")
-                    
-                    # Display retrieval info
-                    retrieval_info = result.get("retrieval_info", {})
-                    if retrieval_info:
-                        st.subheader("Retrieval Information")
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric(
-                                "Vector Results",
-                                retrieval_info.get("vector_results_count", 0)
-                            )
-                        with col2:
-                            st.metric(
-                                "Graph Context",
-                                retrieval_info.get("graph_context_count", 0)
-                            )
-                        with col3:
-                            st.metric(
-                                "Total Context",
-                                retrieval_info.get("total_context_items", 0)
-                            )
-                    
-                    # Add to query history
-                    st.session_state.query_history.append({
-                        "query": user_query,
-                        "result": result,
-                        "timestamp": time.time(),
-                    })
-                else:
-                    st.error("❌ Query failed")
-                    st.json(result)
+                # Display sources
+                sources = result.get("sources", [])
+                if sources:
+                    st.subheader("Sources")
+                    for idx, source in enumerate(sources, 1):
+                        filename = source.get("filename", "Unknown")
+                        chunk_index = source.get("chunk_index")
+                        details = (
+                            f"**Document:** {filename}\n\n"
+                            f"**Retrieval Method:** {source.get('source_type', 'unknown')}"
+                        )
+                        if chunk_index is not None:
+                            details += f"\n\n**Chunk Index:** {chunk_index}"
+                        # One markdown element per source instead of one per line
+                        with st.expander(f"Source {idx}: {filename}"):
+                            st.markdown(details)
+                
+                # Display retrieval info
+                retrieval_info = result.get("retrieval_info", {})
+                vector_count, graph_count, total_count = (
+                    retrieval_info.get(key, 0)
+                    for key in ("vector_results_count", "graph_context_count", "total_context_items")
+                )
+                if vector_count or graph_count or total_count:
+                    st.subheader("Retrieval Information")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Vector Results", vector_count)
+                    with col2:
+                        st.metric("Graph Context", graph_count)
+                    with col3:
+                        st.metric("Total Context", total_count)
+                elif retrieval_info:
+                    st.caption("No context was retrieved for this query")
+                
+                # Add to query history (only what the history view shows, not the sources)
+                st.session_state.query_history.append({
+                    "query": user_query,
+                    "answer": result.get("answer", ""),
+                    "sources_count": len(sources),
+                    "timestamp": time.time(),
+                })
+            else:
+                answer_placeholder.empty()
+                st.error("❌ Query failed")
+                st.json(error)
     
-    # Query history
+    # Query history: one table, newest first; selecting a row shows its full answer
     if st.session_state.query_history:
         st.subheader("Query History")
-        for idx, item in enumerate(reversed(st.session_state.query_history[-5:]), 1):
-            with st.expander(f"Query {idx}: {item['query'][:50]}..."):
-                st.markdown(f"**Query:** {item['query']}")
-                st.markdown("**Answer:**")
-                st.markdown(item['result'].get("answer", "No answer"))
-                st.markdown(f"**Sources:** {len(item['result'].get('sources', []))} document(s)")
+        history = list(reversed(st.session_state.query_history))
+        selection = st.dataframe(
+            [
+                {
+                    "Time": time.strftime("%H:%M:%S", time.localtime(item["timestamp"])),
+                    "Query": item["query"][:80],
+                    "Answer": item["answer"][:120],
+                    "Sources": item["sources_count"],
+                }
+                for item in history
+            ],
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+        )
+        for row in selection.selection.rows:
+            item = history[row]
+            st.markdown(f"**Query:** {item['query']}")
+            st.markdown("**Answer:**")
+            st.markdown(item["answer"] or "No answer")
+
+
+# Tab 1: Document Upload
+with tab1:
+    render_upload_tab(API_BASE_URL)
+    render_ingestion_status(API_BASE_URL)
+
+# Tab 2: Query
+with tab2:
+    render_query_tab(API_BASE_URL)
 
 # Footer
 st.markdown("---")
-st.markdown(
-    """
-    <div style='text-align: center; color: gray;'>
-        Context-Aware Research Assistant | Powered by LlamaIndex, Neo4j, and GraphRAG
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 